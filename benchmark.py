@@ -0,0 +1,550 @@
+"""
+Benchmarks for faceless_short_automation
+========================================
+Run from the repo root with the same environment as the main script.
+
+```bash
+# MoviePy vs. ffmpeg render engine on synthetic clips (3 runs each)
+python benchmark.py engines --runs 3
+
+# ...or on real inputs
+python benchmark.py engines --clips a.mp4 b.mp4 c.mp4 --audio voice.mp3
+
+# encoder profiles: encode time vs. size, plus upload time at a given uplink
+python benchmark.py profiles --uplink-mbps 20
+
+# import-time guard: fails if heavy deps load at import or import gets slow
+python benchmark.py imports --max-ms 150
+
+# streamed script: same sentences whatever the chunking (exits non-zero if not)
+python benchmark.py sentences --chunk-chars 0 1 7 500
+
+# resumable upload: MB/s per chunk size with 10% of chunks failing, plus a
+# crash-and-resume check (exits non-zero if the resume starts a new session)
+python benchmark.py upload --size-mb 64 --chunk-mb 1 4 16 --fail-rate 0.1
+
+# offline end-to-end + per-stage timings against local API stand-ins
+python benchmark.py pipeline --iterations 10 --latency-ms 40 --json bench.json
+python benchmark.py pipeline --stages search clip voice --cache warm
+SCRIPT_STREAM=0 python benchmark.py pipeline --stages prepare --token-ms 30 --latency-ms 40
+```
+"""
+from __future__ import annotations
+import argparse, base64, json, os, platform, random, re, statistics, subprocess, sys, tempfile, threading, time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import faceless_short_automation as fsa
+
+SAMPLE_SCRIPT = (
+    "Octopuses have three hearts and blue blood. Honey never spoils. "
+    "Bananas are berries, but strawberries are not. Which fact surprised you most?"
+)
+
+# ─────────────────────────── INPUTS ───────────────────────────
+
+def synth_inputs(root: Path, n_clips: int = 3, seconds: float = 8.0,
+                 voice_seconds: float = 18.0) -> tuple[list[Path], Path]:
+    """Synthetic stock clips (mixed sizes and fps, like Pexels) and a sine voice-over."""
+    sizes = ["720x1280", "1080x1920", "1440x2560"]
+    clips = []
+    for i in range(n_clips):
+        out = root / f"clip{i}.mp4"
+        ffmpeg("-f", "lavfi", "-i", f"testsrc2=size={sizes[i % 3]}:rate={24 + i}:duration={seconds}",
+               "-c:v", "libx264", "-preset", "ultrafast", "-crf", "30", "-pix_fmt", "yuv420p",
+               "-movflags", "+faststart", out)
+        clips.append(out)
+    audio = root / "voice.mp3"
+    ffmpeg("-f", "lavfi", "-i", f"sine=frequency=220:duration={voice_seconds}",
+           "-c:a", "libmp3lame", "-b:a", "128k", audio)
+    return clips, audio
+
+def ffmpeg(*args) -> None:
+    subprocess.run([fsa.FFMPEG, "-y", "-v", "error", *map(str, args)], check=True)
+
+def inputs(args, root: Path) -> tuple[list[Path], Path]:
+    if args.clips:
+        return [Path(p) for p in args.clips], Path(args.audio)
+    return synth_inputs(root)
+
+# ─────────────────────────── REPORTING ────────────────────────
+
+def percentiles(xs: list[float]) -> dict:
+    qs = statistics.quantiles(xs, n=100, method="inclusive") if len(xs) > 1 else xs * 99
+    return {"n": len(xs), "mean": statistics.mean(xs), "p50": qs[49], "p90": qs[89],
+            "p95": qs[94], "max": max(xs)}
+
+def summarize(times: list[float], unit: str = "s") -> dict:
+    return {"runs": len(times), "mean": statistics.mean(times), "min": min(times),
+            "max": max(times), "unit": unit}
+
+def report(results: dict, json_path: str | None) -> None:
+    for name, r in results.items():
+        print(f"{name:<14}" + "  ".join(f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}"
+                                      for k, v in r.items()))
+    if json_path:
+        Path(json_path).write_text(json.dumps(results, indent=2))
+        print("Results →", json_path)
+
+# ──────────────────────── API STAND-INS ───────────────────────
+
+class Fixtures:
+    """Local stand-ins for every remote API, on one keep-alive HTTP server:
+
+    /pexels/videos/search         canned search JSON pointing at /cdn/
+    /cdn/clipN.mp4                synthetic faststart clips, Range-aware
+    /eleven/v1/text-to-speech/…   sine MP3 as long as the text at `speech_wps`
+                                  (NDJSON + character timings for …/with-timestamps)
+    /openai/v1/chat/completions   canned chat completion (JSON mode: one script
+                                  per topic listed in the prompt; SSE when streamed)
+    /youtube/token                OAuth token
+    /upload/youtube/v3/videos     resumable upload (init → PUT chunks → 308/200)
+
+    `latency_ms` is added to every request; `fail_rate` makes that share of
+    upload chunk PUTs answer 503; completions take `token_ms` per word
+    (streamed ones deliver each chunk after that delay). Streams send one word
+    per chunk, or `stream_chars` characters when set, which splits words and
+    packs several sentences into one chunk. The voice-over is read at
+    `speech_wps`, slower than the main script's SPEECH_WPS estimate by
+    default, so clip downloads sized from the script come up short and get
+    topped up."""
+
+    def __init__(self, root: Path, latency_ms: float = 0, fail_rate: float = 0, token_ms: float = 0,
+                 speech_wps: float = 2.0):
+        root.mkdir(parents=True, exist_ok=True)
+        self.root, self.speech_wps, self._voice_lock = root, speech_wps, threading.Lock()
+        self.clips, self.audio = synth_inputs(root, seconds=20)
+        self.latency, self.fail_rate, self.token_delay = latency_ms / 1000, fail_rate, token_ms / 1000
+        self.uploads: dict[str, list[int]] = {}  # upload id → [received, total]
+        self.put_bytes = 0  # every upload PUT body, including rejected ones
+        self.scripts_served = 0
+        self.stream_chars = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(self))
+        self.server.daemon_threads = True
+        self.server.handle_error = self._handle_error
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def _handle_error(self, request, client_address) -> None:
+        if not isinstance(sys.exc_info()[1], ConnectionError):  # clients drop ranged downloads early
+            ThreadingHTTPServer.handle_error(self.server, request, client_address)
+
+    def __enter__(self) -> Fixtures:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown(); self.server.server_close()
+
+    def search_json(self) -> dict:
+        videos = []
+        for i, clip in enumerate(self.clips):
+            w, h = map(int, re.search(r"\b(\d{2,5})x(\d{2,5})\b", probe(clip)).groups())
+            videos.append({"id": 1000 + i, "duration": 20, "video_files": [{
+                "id": i, "file_type": "video/mp4", "width": w, "height": h, "fps": 24 + i,
+                "size": clip.stat().st_size, "link": f"{self.url}/cdn/{clip.name}"}]})
+        return {"videos": videos}
+
+    def completion_json(self, request: dict) -> dict:
+        content, n = SAMPLE_SCRIPT, 1
+        if (request.get("response_format") or {}).get("type") == "json_object":
+            topics = json.loads(request["messages"][-1]["content"].rpartition("Topics: ")[2])
+            self.scripts_served += len(topics)  # numbered, so the script pool can tell them apart
+            scripts = [{"topic": t, "script": f"Take {self.scripts_served - len(topics) + i + 1}. {SAMPLE_SCRIPT}"}
+                       for i, t in enumerate(topics)]
+            content, n = json.dumps({"scripts": scripts}), len(topics)
+        return {"id": "chatcmpl-bench", "object": "chat.completion", "created": 0,
+                "model": "gpt-3.5-turbo-0125",
+                "choices": [{"index": 0, "finish_reason": "stop", "logprobs": None,
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": 30 + 10 * n, "completion_tokens": 60 * n, "total_tokens": 30 + 70 * n}}
+
+    def completion_chunks(self, request: dict) -> list[dict]:
+        """`completion_json` as stream chunks: one per word (or per
+        `stream_chars` characters), then the usage."""
+        done = self.completion_json(request)
+        base = {"id": done["id"], "object": "chat.completion.chunk", "created": 0, "model": done["model"]}
+        text, n = done["choices"][0]["message"]["content"], self.stream_chars
+        parts = [text[i:i + n] for i in range(0, len(text), n)] if n else re.findall(r"\S+\s*", text)
+        chunks = [{**base, "choices": [{"index": 0, "delta": {"content": part}, "finish_reason": None}]}
+                  for part in parts]
+        chunks.append({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        if (request.get("stream_options") or {}).get("include_usage"):
+            chunks.append({**base, "choices": [], "usage": done["usage"]})
+        return chunks
+
+    def voice_seconds(self, text: str) -> float:
+        return round(max(len(text.split()), 1) / self.speech_wps, 1)
+
+    def voice(self, text: str) -> bytes:
+        """A sine MP3 lasting `voice_seconds(text)`, synthesized once per length."""
+        seconds = self.voice_seconds(text); path = self.root / f"voice_{seconds}.mp3"
+        with self._voice_lock:
+            if not path.exists():
+                ffmpeg("-f", "lavfi", "-i", f"sine=frequency=220:duration={seconds}",
+                       "-c:a", "libmp3lame", "-b:a", "128k", path)
+        return path.read_bytes()
+
+    def timed_tts(self, text: str, chunks: int = 3) -> bytes:
+        """`voice(text)` as ElevenLabs' streamed NDJSON, with `text`'s characters
+        spread evenly over it; every chunk's times restart at 0 like the API's."""
+        audio, step, lines = self.voice(text), self.voice_seconds(text) / max(len(text), 1), []
+        a, t = -(-len(audio) // chunks), -(-len(text) // chunks)
+        for i in range(chunks):
+            part = text[i * t:(i + 1) * t]
+            lines.append(json.dumps({"audio_base64": base64.b64encode(audio[i * a:(i + 1) * a]).decode(),
+                                     "alignment": {"characters": list(part),
+                                                   "character_start_times_seconds": [j * step for j in range(len(part))],
+                                                   "character_end_times_seconds": [(j + 1) * step for j in range(len(part))]}}))
+        return "\n".join(lines).encode()
+
+def probe(path: Path) -> str:
+    """ffmpeg's stream banner for `path` (ffmpeg -i exits non-zero by design)."""
+    return subprocess.run([fsa.FFMPEG, "-hide_banner", "-i", str(path)], capture_output=True,
+                          text=True).stderr.split("Video:", 1)[-1]
+
+def _handler(fx: Fixtures):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so client-side pooling shows up
+
+        def log_message(self, *args):
+            pass
+
+        def send(self, status: int, body: bytes = b"", ctype: str = "application/json", **headers):
+            self.send_response(status)
+            self.send_header("Content-Type", ctype); self.send_header("Content-Length", str(len(body)))
+            for k, v in headers.items():
+                self.send_header(k.replace("_", "-"), v)
+            self.end_headers()
+            for i in range(0, len(body), 1 << 14):
+                self.wfile.write(body[i:i + (1 << 14)])
+
+        def stream(self, events: list[bytes], delay: float):
+            """Chunked `text/event-stream` response, one event per `delay`."""
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream"); self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for event in events:
+                time.sleep(delay)
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(event), event)); self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+
+        def body(self) -> bytes:
+            return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        def do_GET(self):
+            time.sleep(fx.latency); path = urlsplit(self.path).path
+            if path == "/pexels/videos/search":
+                self.send(200, json.dumps(fx.search_json()).encode())
+            elif path.startswith("/cdn/"):
+                self.cdn(fx.clips[0].parent / path.rsplit("/", 1)[-1])
+            else:
+                self.send(404)
+
+        def do_POST(self):
+            time.sleep(fx.latency); url = urlsplit(self.path); body = self.body()
+            if url.path.startswith("/eleven/v1/text-to-speech/") and url.path.endswith("/with-timestamps"):
+                self.send(200, fx.timed_tts(json.loads(body)["text"]), "application/x-ndjson")
+            elif url.path.startswith("/eleven/v1/text-to-speech/"):
+                self.send(200, fx.voice(json.loads(body)["text"]), "audio/mpeg")
+            elif url.path == "/openai/v1/chat/completions" and json.loads(body).get("stream"):
+                self.stream([f"data: {json.dumps(c)}\n\n".encode() for c in fx.completion_chunks(json.loads(body))]
+                            + [b"data: [DONE]\n\n"], fx.token_delay)
+            elif url.path == "/openai/v1/chat/completions":
+                done = fx.completion_json(json.loads(body))
+                time.sleep(fx.token_delay * len(done["choices"][0]["message"]["content"].split()))
+                self.send(200, json.dumps(done).encode())
+            elif url.path == "/youtube/token":
+                self.send(200, json.dumps({"access_token": "bench", "expires_in": 3600,
+                                           "token_type": "Bearer"}).encode())
+            elif url.path == "/upload/youtube/v3/videos" and "resumable" in url.query:
+                uid = f"{len(fx.uploads) + 1}-{random.randrange(1 << 30)}"
+                fx.uploads[uid] = [0, int(self.headers.get("X-Upload-Content-Length") or -1)]
+                self.send(200, Location=f"{fx.url}/upload/youtube/v3/videos?uploadType=resumable&upload_id={uid}")
+            else:
+                self.send(404)
+
+        def do_PUT(self):
+            time.sleep(fx.latency); chunk = self.body(); fx.put_bytes += len(chunk)
+            state = fx.uploads.get(parse_qs(urlsplit(self.path).query).get("upload_id", [""])[0])
+            if state is None:
+                return self.send(404)
+            rng = re.match(r"bytes (\*|(\d+)-(\d+))/(\d+|\*)", self.headers.get("Content-Range", ""))
+            if rng and rng[4] != "*":
+                state[1] = int(rng[4])
+            if chunk and random.random() < fx.fail_rate:
+                return self.send(503)
+            if rng and rng[2] is not None and int(rng[2]) == state[0]:
+                state[0] += len(chunk)
+            elif not rng and chunk:  # single-request upload without Content-Range
+                state[0] += len(chunk); state[1] = state[0]
+            if state[0] >= state[1] > 0 or (not rng and chunk):
+                self.send(200, json.dumps({"kind": "youtube#video", "id": "bench-video"}).encode())
+            else:
+                self.send(308, **({"Range": f"bytes=0-{state[0] - 1}"} if state[0] else {}))
+
+        def cdn(self, path: Path):
+            if not path.exists():
+                return self.send(404)
+            data = path.read_bytes()
+            m = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+            if not m:
+                return self.send(200, data, "video/mp4", Accept_Ranges="bytes")
+            start = int(m[1]); end = min(int(m[2]) if m[2] else len(data) - 1, len(data) - 1)
+            self.send(206, data[start:end + 1], "video/mp4",
+                      Content_Range=f"bytes {start}-{end}/{len(data)}")
+    return Handler
+
+def point_at(fx: Fixtures, root: Path) -> None:
+    """Rewire the main module's API roots, credentials and work dir to `fx`."""
+    fsa.PEXELS_API = f"{fx.url}/pexels"; fsa.ELEVEN_API = f"{fx.url}/eleven"
+    fsa.YT_UPLOAD_URL = f"{fx.url}/upload/youtube/v3/videos"
+    fsa.WORKDIR = root / "work"; fsa.WORKDIR.mkdir(parents=True, exist_ok=True)
+    fsa.CACHE_DIR = root / "cache"  # keeps the script pool away from the real one
+    os.environ.update(OPENAI_API_KEY="bench", OPENAI_BASE_URL=f"{fx.url}/openai/v1",
+                      YT_REFRESH_TOKEN="bench", YT_CLIENT_ID="bench", YT_CLIENT_SECRET="bench",
+                      YT_TOKEN_URI=f"{fx.url}/youtube/token")
+    fsa.openai_client.cache_clear()
+
+def fresh_caches(root: Path) -> None:
+    """Swap every module-level DiskCache for an empty one under `root`."""
+    for name, cache in list(vars(fsa).items()):
+        if isinstance(cache, fsa.DiskCache):
+            setattr(fsa, name, fsa.DiskCache(root / name.lower(), cache.max_bytes))
+
+# ─────────────────────────── BENCHMARKS ───────────────────────
+
+def normalized(build):
+    """`build` fed with normalized intermediates (encoded on the first run,
+    cached after that, so `max` is cold and `min` warm)."""
+    def run(clips, audio, script, out):
+        seg = fsa.plan_segments(audio, len(clips))[1]
+        build(fsa.normalize_clips(clips, seg), audio, script, out, normalized=True)
+    return run
+
+def bench_engines(args) -> None:
+    engines = {"moviepy": fsa.build_video_moviepy, "ffmpeg": fsa.build_video_ffmpeg,
+               "segments": fsa.build_video_segments,
+               "moviepy+normalized": normalized(fsa.build_video_moviepy),
+               "ffmpeg+normalized": normalized(fsa.build_video_ffmpeg)}
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp); clips, audio = inputs(args, root); fresh_caches(root / "cache")
+        results = {}
+        for name, build in engines.items():
+            times = []
+            for i in range(args.runs):
+                out = root / f"{name}_{i}.mp4"
+                t0 = time.perf_counter(); build(clips, audio, SAMPLE_SCRIPT, out)
+                times.append(time.perf_counter() - t0)
+            results[name] = {**summarize(times), "size_mb": out.stat().st_size / 1e6}
+    results["speedup"] = {"ffmpeg_vs_moviepy": results["moviepy"]["mean"] / results["ffmpeg"]["mean"],
+                          "segments_vs_ffmpeg": results["ffmpeg"]["mean"] / results["segments"]["mean"]}
+    report(results, args.json)
+
+def bench_profiles(args) -> None:
+    """Encode the same inputs with every encoder profile; rank by encode time
+    plus the upload time the output size implies at `--uplink-mbps`."""
+    build = {"moviepy": fsa.build_video_moviepy, "ffmpeg": fsa.build_video_ffmpeg,
+             "segments": fsa.build_video_segments}[args.engine]
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp); clips, audio = inputs(args, root)
+        results = {}
+        for name in fsa.ENCODER_PROFILES:
+            times = []
+            for i in range(args.runs):
+                out = root / f"{name}_{i}.mp4"
+                t0 = time.perf_counter(); build(clips, audio, SAMPLE_SCRIPT, out, name)
+                times.append(time.perf_counter() - t0)
+            size_mb = out.stat().st_size / 1e6
+            upload_s = size_mb * 8 / args.uplink_mbps
+            results[name] = {**summarize(times), "size_mb": size_mb, "upload_s": upload_s,
+                             "end_to_end_s": statistics.mean(times) + upload_s}
+    best = min(results, key=lambda k: results[k]["end_to_end_s"])
+    results["fastest_end_to_end"] = {"profile": best, "default": fsa.ENCODER_PROFILE}
+    report(results, args.json)
+
+PIPELINE_STAGES = ["script", "scripts", "prepare", "search", "clip", "voice", "render", "upload", "run_once"]
+
+def bench_pipeline(args) -> None:
+    """Time each stage in isolation, and `run_once` end to end (with its own
+    per-stage breakdown from the run report), over N iterations offline."""
+    with tempfile.TemporaryDirectory() as tmp, \
+            Fixtures(Path(tmp) / "fixtures", args.latency_ms, args.fail_rate, args.token_ms) as fx:
+        root = Path(tmp); point_at(fx, root); fresh_caches(root / "cache" / "warm")
+        rendered = root / "render.mp4"
+        stages = {
+            "script": lambda: fsa.generate_script("deep-sea creatures", "en"),
+            "scripts": lambda: fsa.generate_scripts(fsa.TOPICS, "en"),
+            "prepare": lambda: fsa.prepare_short("en", "deep-sea creatures"),
+            "search": lambda: fsa.pexels_search("deep-sea"),
+            "clip":   lambda: fsa.fetch_vertical_clip("deep-sea", fsa.estimate_duration(SAMPLE_SCRIPT) / 3),
+            "voice":  lambda: fsa.generate_voiceover(SAMPLE_SCRIPT, "en"),
+            "render": lambda: fsa.build_video(fx.clips, fx.audio, SAMPLE_SCRIPT, rendered),
+            "upload": lambda: fsa.upload_short(rendered if rendered.exists() else fx.clips[0],
+                                               "bench", SAMPLE_SCRIPT),
+            "run_once": lambda: fsa.run_once("en", upload=True),
+        }
+        samples: dict[str, list[float]] = defaultdict(list)
+        for i in range(args.iterations):
+            for name in args.stages:
+                if args.cache == "cold":
+                    fresh_caches(root / "cache" / f"{name}-{i}")
+                t0 = time.perf_counter(); result = stages[name]()
+                samples[name].append(time.perf_counter() - t0)
+                if name == "run_once":
+                    for rec in result.report.stages:
+                        samples[f"run_once.{rec['stage']}"].append(rec["wall_s"])
+    results = {name: percentiles(xs) for name, xs in samples.items()}
+    report(results, None)
+    if args.json:
+        meta = {"commit": _git_head(), "python": platform.python_version(), "iterations": args.iterations,
+                "cache": args.cache, "latency_ms": args.latency_ms, "engine": fsa.RENDER_ENGINE}
+        Path(args.json).write_text(json.dumps({"meta": meta, "results": results}, indent=2))
+        print("Results →", args.json)
+
+class SimulatedCrash(Exception):
+    pass
+
+def bench_upload(args) -> None:
+    """Resumable upload throughput per chunk size against the local endpoint,
+    then a crash-and-resume check: an upload aborted halfway is finished by a
+    fresh call, which must reuse the saved session and send only the rest."""
+    with tempfile.TemporaryDirectory() as tmp, \
+            Fixtures(Path(tmp) / "fixtures", args.latency_ms, args.fail_rate) as fx:
+        root = Path(tmp); point_at(fx, root)
+        video = root / "upload.mp4"; video.write_bytes(os.urandom(int(args.size_mb * 1e6)))
+        size, creds = video.stat().st_size, fsa.yt_credentials()
+        meta = {"snippet": {"title": "bench"}, "status": {"privacyStatus": "private"}}
+        quiet = lambda done, total: None
+        results = {}
+        for mb in args.chunk_mb:
+            fsa.UPLOAD_CHUNK_MB = mb; times = []; fx.put_bytes = 0
+            for _ in range(args.runs):
+                t0 = time.perf_counter(); fsa.resumable_upload(video, meta, creds, quiet)
+                times.append(time.perf_counter() - t0)
+            results[f"chunk_{mb:g}MB"] = {**summarize(times), "mb_per_s": size / 1e6 / statistics.mean(times),
+                                          "wire_ratio": fx.put_bytes / (size * args.runs)}
+        fsa.UPLOAD_CHUNK_MB = min(args.chunk_mb); sessions = len(fx.uploads); fx.put_bytes = 0
+        def crash(done, total):
+            if done >= total // 2:
+                raise SimulatedCrash
+        try:
+            fsa.resumable_upload(video, meta, creds, crash)
+        except SimulatedCrash:
+            pass
+        before = fx.put_bytes; fsa.resumable_upload(video, meta, creds, quiet)
+        resume = {"sessions": len(fx.uploads) - sessions, "sent_before_crash_mb": before / 1e6,
+                  "wire_ratio": fx.put_bytes / size}
+        results["crash_resume"] = resume
+    report(results, args.json)
+    if resume["sessions"] != 1:
+        sys.exit(f"FAIL: resuming started {resume['sessions']} upload sessions")
+
+def bench_sentences(args) -> None:
+    """Streamed `generate_script` against chunkings the word-per-chunk stream
+    never produces: words split across chunks and several sentences per
+    chunk. Every chunking must hand over the same sentences, in order."""
+    expected = re.split(r"(?<=[.!?])\s+", SAMPLE_SCRIPT)
+    results, wrong = {}, []
+    with tempfile.TemporaryDirectory() as tmp, Fixtures(Path(tmp) / "fixtures") as fx:
+        point_at(fx, Path(tmp))
+        for n in args.chunk_chars:
+            fx.stream_chars = n; got = []; times = []
+            for _ in range(args.runs):
+                got.clear(); t0 = time.perf_counter()
+                fsa.generate_script("deep-sea creatures", "en", got.append)
+                times.append(time.perf_counter() - t0)
+            results[f"chunk_{n or 'word'}"] = {**summarize(times), "sentences": len(got),
+                                              "ok": got == expected}
+            if got != expected:
+                wrong.append(f"{n or 'word'}: {got!r}")
+    report(results, args.json)
+    if wrong:
+        sys.exit("FAIL: wrong sentences for chunking " + "; ".join(wrong))
+
+def _git_head() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=Path(__file__).resolve().parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+HEAVY_MODULES = ["moviepy", "numpy", "imageio", "requests", "openai",
+                 "googleapiclient", "google_auth_oauthlib"]
+
+def bench_imports(args) -> None:
+    """`python -X importtime` over the main module; guards against heavy
+    dependencies creeping back into import time."""
+    cmd = [sys.executable, "-X", "importtime", "-c",
+           "import sys, json, faceless_short_automation; print(json.dumps(sorted(sys.modules)))"]
+    times, loaded = [], set()
+    for _ in range(args.runs):
+        proc = subprocess.run(cmd, capture_output=True, text=True, check=True,
+                              cwd=Path(__file__).resolve().parent)
+        loaded = set(json.loads(proc.stdout.splitlines()[-1]))
+        # "import time: self [us] | cumulative | imported package" — last line is the module itself
+        rows = [l.split("|") for l in proc.stderr.splitlines() if l.startswith("import time:")]
+        total = next(int(r[1]) for r in rows if r[2].strip() == "faceless_short_automation")
+        times.append(total / 1000)
+    heavy = sorted(m for m in HEAVY_MODULES if m in loaded)
+    report({"import": {**summarize(times, "ms"), "heavy_loaded": ",".join(heavy) or "-"}}, args.json)
+    if heavy:
+        sys.exit(f"FAIL: heavy modules imported at module load: {', '.join(heavy)}")
+    if args.max_ms and min(times) > args.max_ms:
+        sys.exit(f"FAIL: import took {min(times):.0f} ms > {args.max_ms:.0f} ms")
+
+# ───────────────────────────── CLI ────────────────────────────
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser("shorts-factory benchmarks")
+    sub = ap.add_subparsers(dest="bench", required=True)
+    p = sub.add_parser("engines", help="MoviePy vs. ffmpeg render engine")
+    p.add_argument("--clips", nargs="+", help="Input clips (default: synthetic)")
+    p.add_argument("--audio", help="Voice-over to mux (required with --clips)")
+    p.add_argument("--runs", type=int, default=3)
+    p.add_argument("--json", help="Write results to this file")
+    p.set_defaults(func=bench_engines)
+    p = sub.add_parser("profiles", help="Encoder profiles: encode time vs. output size")
+    p.add_argument("--clips", nargs="+", help="Input clips (default: synthetic)")
+    p.add_argument("--audio", help="Voice-over to mux (required with --clips)")
+    p.add_argument("--runs", type=int, default=2)
+    p.add_argument("--uplink-mbps", type=float, default=20, help="Upload bandwidth for the estimate")
+    p.add_argument("--engine", choices=["moviepy", "ffmpeg", "segments"], default="ffmpeg")
+    p.add_argument("--json", help="Write results to this file")
+    p.set_defaults(func=bench_profiles)
+    p = sub.add_parser("imports", help="Module import time (python -X importtime)")
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--max-ms", type=float, help="Fail when the fastest import exceeds this")
+    p.add_argument("--json", help="Write results to this file")
+    p.set_defaults(func=bench_imports)
+    p = sub.add_parser("pipeline", help="Offline run_once + per-stage timings against local stand-ins")
+    p.add_argument("--iterations", type=int, default=5)
+    p.add_argument("--stages", nargs="+", choices=PIPELINE_STAGES, default=PIPELINE_STAGES)
+    p.add_argument("--cache", choices=["cold", "warm"], default="cold",
+                   help="cold: empty caches before every stage run")
+    p.add_argument("--latency-ms", type=float, default=0, help="Added to every fixture request")
+    p.add_argument("--fail-rate", type=float, default=0, help="Share of upload chunks answered 503")
+    p.add_argument("--token-ms", type=float, default=0, help="Completion time per generated word")
+    p.add_argument("--engine", choices=["moviepy", "ffmpeg", "segments"], default=fsa.RENDER_ENGINE)
+    p.add_argument("--json", help="Write results to this file")
+    p.set_defaults(func=bench_pipeline)
+    p = sub.add_parser("upload", help="Resumable upload MB/s per chunk size, plus crash/resume")
+    p.add_argument("--size-mb", type=float, default=32)
+    p.add_argument("--chunk-mb", type=float, nargs="+", default=[1, 4, 8])
+    p.add_argument("--runs", type=int, default=3)
+    p.add_argument("--latency-ms", type=float, default=0, help="Added to every fixture request")
+    p.add_argument("--fail-rate", type=float, default=0, help="Share of upload chunks answered 503")
+    p.add_argument("--json", help="Write results to this file")
+    p.set_defaults(func=bench_upload)
+    p = sub.add_parser("sentences", help="Streamed script: sentence hand-off per chunk size")
+    p.add_argument("--chunk-chars", type=int, nargs="+", default=[0, 1, 3, 7, 50, 500],
+                   help="Characters per stream chunk (0: one word per chunk)")
+    p.add_argument("--runs", type=int, default=3)
+    p.add_argument("--json", help="Write results to this file")
+    p.set_defaults(func=bench_sentences)
+    args = ap.parse_args()
+    if getattr(args, "clips", None) and not args.audio:
+        sys.exit("ERROR: --audio is required with --clips")
+    if getattr(args, "engine", None):
+        fsa.RENDER_ENGINE = args.engine
+    args.func(args)
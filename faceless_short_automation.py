@@ -1,174 +1,1744 @@
-"""
-Faceless YouTube‑Shorts Automation  ·  OpenAI‑python v1  ·  EN/IT
-================================================================
-• Generates a 15‑20 s vertical Short, voice‑over, captions.
-• Supports **English (default)** or **Italian** via `--lang` or env `LANGUAGE`.
-• `--auth` flag runs Google OAuth once and prints a refresh token.
-
-Quick CLI
----------
-```bash
-# one‑time: get YT refresh‑token
-python faceless_short_automation.py --auth
-
-# daily Short in English (upload)
-python faceless_short_automation.py
-
-# local render in Italian, no upload
-python faceless_short_automation.py --lang it --no-upload
-```
-"""
-from __future__ import annotations
-import os, random, textwrap, tempfile, argparse, sys
-from pathlib import Path
-from datetime import datetime
-
-import requests
-from moviepy.editor import (
-    VideoFileClip, AudioFileClip, concatenate_videoclips,
-    CompositeVideoClip, TextClip,
-)
-from dotenv import load_dotenv
-from google_auth_oauthlib.flow import InstalledAppFlow
-
-# ─────────────────────────── CONFIG ───────────────────────────
-load_dotenv()
-client           = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-PEXELS_API_KEY   = os.getenv("PEXELS_API_KEY")
-ELEVEN_KEY       = os.getenv("ELEVENLABS_API_KEY")
-HEADERS_PEXELS   = {"Authorization": PEXELS_API_KEY}
-
-WORKDIR          = Path(tempfile.gettempdir()) / "short_builder"
-WORKDIR.mkdir(exist_ok=True)
-TARGET_DURATION  = 18  # s
-FONT             = "Montserrat-Bold"
-DEFAULT_LANG     = os.getenv("LANGUAGE", "en")
-VOICE_ID = {
-    "en": "EXAVITQu4vr4xnSDxMaL",  # ElevenLabs EN
-    "it": "TxGEqnHWrfWFTf9VQmLc",  # ElevenLabs IT
-}
-
-# ───────────── OAuth helper (run once with --auth) ─────────────
-
-def get_refresh_token() -> None:
-    if not Path("client_secret.json").exists():
-        sys.exit("ERROR: client_secret.json missing")
-    flow = InstalledAppFlow.from_client_secrets_file(
-        "client_secret.json", scopes=["https://www.googleapis.com/auth/youtube.upload"])
-    creds = flow.run_local_server(port=0, prompt="consent")
-    print("\nREFRESH_TOKEN:\n" + creds.refresh_token + "\n")
-    print("Paste this into GitHub secret YT_REFRESH_TOKEN")
-
-# ────────────────────────── OPENAI SCRIPT ─────────────────────
-
-def generate_script(topic: str, lang: str) -> str:
-    prompt = (
-        f"Scrivi un copione divertente in 3 fatti su {topic} in massimo 60 parole. Termina con una domanda."
-        if lang == "it" else
-        f"Write a fun, 3‑fact script about {topic} in ≤60 words. End with a question."
-    )
-    resp = client.chat.completions.create(
-        model="gpt-3.5-turbo-0125",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.8,
-        max_tokens=90,
-    )
-    return resp.choices[0].message.content.strip()
-
-# ─────────────────────── PEXELS STOCK VIDEO ───────────────────
-
-def fetch_vertical_clip(query: str) -> Path:
-    r = requests.get(
-        "https://api.pexels.com/videos/search",
-        params={"query": query, "orientation": "vertical", "per_page": 10},
-        headers=HEADERS_PEXELS, timeout=20)
-    r.raise_for_status(); vids = r.json().get("videos", [])
-    if not vids:
-        raise RuntimeError(f"No vertical clips for {query!r}")
-    file_link = min(random.choice(vids)["video_files"], key=lambda f: f["width"])["link"]
-    out = WORKDIR / f"{random.randint(1_000_000, 9_999_999)}.mp4"
-    with requests.get(file_link, stream=True, timeout=60) as src, open(out, "wb") as dst:
-        for chunk in src.iter_content(8192):
-            dst.write(chunk)
-    return out
-
-# ───────────────────────── ELEVENLABS TTS ─────────────────────
-
-def generate_voiceover(text: str, lang: str) -> Path:
-    url = f"https://api.elevenlabs.io/v1/text-to-speech/{VOICE_ID.get(lang, VOICE_ID['en'])}"
-    r = requests.post(
-        url,
-        headers={"xi-api-key": ELEVEN_KEY, "Content-Type": "application/json"},
-        json={"text": text, "model_id": "eleven_multilingual_v2"},
-        timeout=60)
-    r.raise_for_status(); out = WORKDIR / "voice.mp3"; out.write_bytes(r.content); return out
-
-# ────────────────────── VIDEO ASSEMBLY (MoviePy) ──────────────
-
-def build_video(clips: list[Path], audio: Path, script: str, out_path: Path):
-    seg = TARGET_DURATION / len(clips)
-    base = concatenate_videoclips([
-        VideoFileClip(str(p)).subclip(0, seg) for p in clips
-    ], method="compose").set_audio(AudioFileClip(str(audio)))
-    caption = TextClip(
-        textwrap.fill(script, 30), fontsize=60, font=FONT,
-        color="white", stroke_color="black", stroke_width=2,
-        size=(base.w * 0.9, None), method="caption")
-    final = CompositeVideoClip([base, caption.set_position(("center", "bottom")).set_duration(base.duration)])
-    final.write_videofile(str(out_path), codec="libx264", audio_codec="aac", fps=30,
-                          preset="ultrafast", threads=4, logger=None)
-
-# ────────────────────────── YOUTUBE UPLOAD ────────────────────
-
-def upload_short(video: Path, title: str, description: str):
-    try:
-        from googleapiclient.discovery import build
-        from googleapiclient.http import MediaFileUpload
-        from google.oauth2.credentials import Credentials
-    except ImportError:
-        print("google-api-python-client missing → skip upload"); return
-    creds = Credentials.from_authorized_user_info({"refresh_token": os.getenv("YT_REFRESH_TOKEN")})
-    yt = build("youtube", "v3", credentials=creds)
-    body = {"snippet": {"title": title, "description": description, "categoryId": "27"},
-            "status": {"privacyStatus": "public"}}
-    req = yt.videos().insert(part="snippet,status", body=body,
-                             media_body=MediaFileUpload(str(video), resumable=True))
-    print("Uploading…", end="")
-    while True:
-        status, resp = req.next_chunk()
-        if resp: print(" done →", resp.get("id")); break
-        if status: print(f" {status.progress()*100:.1f}%", end="")
-
-# ────────────────────────── MAIN ROUTINE ──────────────────────
-
-def pick_topic() -> str:
-    return random.choice([
-        "quantum computing", "Mars colonization", "deep-sea creatures",
-        "ancient Egyptian tech", "AI art", "sustainable architecture",
-    ])
-
-def run_once(lang: str, upload: bool):
-    topic  = pick_topic(); script = generate_script(topic, lang)
-    print("SCRIPT:\n" + script)
-    clips  = [fetch_vertical_clip(k) for k in topic.split()[:3]]
-    voice  = generate_voiceover(script, lang)
-    out    = WORKDIR / f"short_{datetime.utcnow():%Y%m%d_%H%M%S}.mp4"
-    build_video(clips, voice, script, out)
-    print("Video saved →", out)
-    if upload:
-        title = ("3 facts about " if lang == "en" else "3 fatti su ") + topic
-        upload_short(out, title, script)
-
-# ───────────────────────────── CLI ────────────────────────────
-if __name__ == "__main__":
-    ap = argparse.ArgumentParser("Faceless Shorts generator")
-    ap.add_argument("--auth",      action="store_true", help="Run OAuth only & exit")
-    ap.add_argument("--lang",      choices=["en","it"], default=DEFAULT_LANG, help="Script language")
-    ap.add_argument("--no-upload", action="store_true", help="Render but don't upload")
-    args = ap.parse_args()
-
-    if args.auth:
-        get_refresh_token(); sys.exit()
-
-    run_once(args.lang, upload=not args.no_upload)
-
+"""
+Faceless YouTube‑Shorts Automation  ·  OpenAI‑python v1  ·  EN/IT
+================================================================
+• Generates a vertical Short timed to its voice‑over (≤ 60 s), with captions.
+• Supports **English (default)** or **Italian** via `--lang` or env `LANGUAGE`.
+• `--auth` flag runs Google OAuth once and prints a refresh token.
+
+Quick CLI
+---------
+```bash
+# one‑time: get YT refresh‑token
+python faceless_short_automation.py --auth
+
+# daily Short in English (upload)
+python faceless_short_automation.py
+
+# local render in Italian, no upload
+python faceless_short_automation.py --lang it --no-upload
+
+# render through a single native ffmpeg filtergraph instead of MoviePy,
+# or encode each clip's segment in parallel and stream-copy them together
+python faceless_short_automation.py --engine ffmpeg
+python faceless_short_automation.py --engine segments
+
+# the whole script as one caption instead of word-timed phrases
+python faceless_short_automation.py --captions static
+
+# a week's queue in one process (random topics, or one per line of a file)
+python faceless_short_automation.py --count 7
+python faceless_short_automation.py --batch topics.txt
+
+# render at full speed and upload separately (another process or a later step)
+python faceless_short_automation.py --count 7 --enqueue
+python faceless_short_automation.py --upload-worker 2
+
+# pre-generate a week of scripts per topic, so runs skip the OpenAI round trip
+python faceless_short_automation.py --prefill-scripts 7 --lang it
+
+# retry a failed run without re-paying for finished stages
+python faceless_short_automation.py --resume 20240101_170000_123456
+```
+"""
+from __future__ import annotations
+import os, re, random, tempfile, argparse, sys, time, json, hashlib, threading, shutil, subprocess, struct
+import functools, contextvars, contextlib, base64, bisect, math, sqlite3
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, TYPE_CHECKING
+from dataclasses import dataclass, field
+from collections import Counter, defaultdict
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+try:
+    import resource  # POSIX only; RSS/child-CPU figures are omitted elsewhere
+except ImportError:
+    resource = None
+
+from dotenv import load_dotenv
+# requests, MoviePy, OpenAI and the Google libraries are imported inside the
+# stages that use them, so `--auth` / `--help` start without loading them.
+if TYPE_CHECKING:
+    import requests
+
+# ─────────────────────────── CONFIG ───────────────────────────
+load_dotenv()
+PEXELS_API_KEY   = os.getenv("PEXELS_API_KEY")
+ELEVEN_KEY       = os.getenv("ELEVENLABS_API_KEY")
+HEADERS_PEXELS   = {"Authorization": PEXELS_API_KEY}
+# API roots can point at local stand-ins (see `benchmark.py pipeline`);
+# OpenAI honours OPENAI_BASE_URL natively.
+PEXELS_API       = os.getenv("PEXELS_API_URL", "https://api.pexels.com")
+ELEVEN_API       = os.getenv("ELEVENLABS_API_URL", "https://api.elevenlabs.io")
+YT_UPLOAD_URL    = os.getenv("YT_UPLOAD_URL", "https://www.googleapis.com/upload/youtube/v3/videos")
+
+WORKDIR          = Path(tempfile.gettempdir()) / "short_builder"
+WORKDIR.mkdir(exist_ok=True)
+CACHE_DIR        = Path(os.getenv("SHORTS_CACHE_DIR", Path.home() / ".cache" / "short_builder"))
+CLIP_CACHE_MB    = int(os.getenv("CLIP_CACHE_MB", "2048"))
+CLIP_VARIETY     = float(os.getenv("CLIP_VARIETY", "0.2"))  # share of clip picks that ignore the cache
+TTS_CACHE_MB     = int(os.getenv("TTS_CACHE_MB", "256"))
+SEARCH_TTL       = float(os.getenv("PEXELS_SEARCH_TTL", "86400"))  # s
+SEARCH_SWR       = os.getenv("PEXELS_SEARCH_SWR", "0") == "1"  # serve stale, refresh in background
+MAX_DURATION     = float(os.getenv("SHORTS_MAX_S", "60"))  # s, YouTube's Shorts limit
+TAIL_PAD         = 0.4   # s of picture after the last word
+SPEECH_WPS       = 2.3   # words/s, a slow narrator; sizes clip downloads before the TTS exists
+FRAME_W, FRAME_H = 1080, 1920
+FPS              = 30
+RENDER_ENGINE    = os.getenv("RENDER_ENGINE", "moviepy")  # "moviepy" | "ffmpeg" | "segments"
+FFMPEG           = os.getenv("FFMPEG_BINARY") or shutil.which("ffmpeg") or "ffmpeg"
+ENCODER_PROFILE  = os.getenv("ENCODER_PROFILE", "fast-upload")
+FONT             = "Montserrat-Bold"
+FONT_PATH        = os.getenv("FONT_PATH")  # TTF for FONT; looked up with fc-match when unset
+NORMALIZE_CLIPS  = os.getenv("NORMALIZE_CLIPS", "auto")  # "auto" (MoviePy only) | "1" | "0"
+CAPTION_MODE     = os.getenv("CAPTION_MODE", "timed")  # "timed" (word-highlighted phrases) | "static"
+TTS_MODEL        = "eleven_multilingual_v2"
+DEFAULT_LANG     = os.getenv("LANGUAGE", "en")
+ASSET_WORKERS    = int(os.getenv("ASSET_WORKERS", "4"))
+ASSET_TIMEOUT    = float(os.getenv("ASSET_TIMEOUT", "120"))  # s, per task
+RENDER_TIMEOUT   = float(os.getenv("RENDER_TIMEOUT", "900"))  # s, per ffmpeg encode
+HTTP_RETRIES     = int(os.getenv("HTTP_RETRIES", "4"))
+HTTP_BACKOFF     = float(os.getenv("HTTP_BACKOFF", "0.5"))  # s, doubled per attempt
+UPLOAD_CHUNK_MB  = float(os.getenv("UPLOAD_CHUNK_MB", "8"))  # per PUT, rounded down to 256 KiB multiples
+UPLOAD_RETRIES   = int(os.getenv("UPLOAD_RETRIES", "8"))  # consecutive failures before giving up
+UPLOAD_QUEUE     = os.getenv("UPLOAD_QUEUE", "0") == "1"  # enqueue renders for --upload-worker
+UPLOAD_WORKERS   = int(os.getenv("UPLOAD_WORKERS", "2"))  # concurrent uploads in --upload-worker
+UPLOAD_ATTEMPTS  = int(os.getenv("UPLOAD_ATTEMPTS", "3"))  # per queued Short, then "failed"
+UPLOAD_LEASE     = float(os.getenv("UPLOAD_LEASE", "3600"))  # s before a crashed worker's item is retaken
+UPLOAD_IDLE      = float(os.getenv("UPLOAD_IDLE", "0"))  # s the worker waits for new items once drained
+VOICE_ID = {
+    "en": "EXAVITQu4vr4xnSDxMaL",  # ElevenLabs EN
+    "it": "TxGEqnHWrfWFTf9VQmLc",  # ElevenLabs IT
+}
+
+# ─────────────────────────── TRACING ──────────────────────────
+
+class RunReport:
+    """Per-stage records for one Short, written as JSON next to its MP4."""
+
+    def __init__(self):
+        self.started = time.time(); self.stages: list[dict] = []
+        self._lock = threading.Lock()
+
+    def add(self, record: dict) -> None:
+        with self._lock:
+            self.stages.append(record)
+
+    def write(self, path: Path) -> None:
+        with self._lock:
+            totals: dict[str, Counter] = defaultdict(Counter)
+            for rec in self.stages:
+                totals[rec["stage"]].update({k: v for k, v in rec.items()
+                                             if isinstance(v, (int, float)) and k != "peak_rss_mb"})
+                totals[rec["stage"]]["calls"] += 1
+            data = {"started": datetime.utcfromtimestamp(self.started).isoformat() + "Z",
+                    "wall_s": round(time.time() - self.started, 3),
+                    "stages": self.stages,
+                    "totals": {k: {n: round(v, 3) for n, v in c.items()} for k, c in totals.items()}}
+        path.write_text(json.dumps(data, indent=2))
+
+_REPORT: contextvars.ContextVar[RunReport | None] = contextvars.ContextVar("report", default=None)
+_STAGE: contextvars.ContextVar[dict | None] = contextvars.ContextVar("stage", default=None)
+
+def traced(name: str):
+    """Record wall/CPU time, peak RSS and `trace_count` counters of each call
+    into the current RunReport (no-op outside one). `child_cpu_s` is the CPU
+    of subprocesses (ffmpeg) reaped meanwhile, process-wide."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kw):
+            report = _REPORT.get()
+            if report is None:
+                return fn(*args, **kw)
+            rec = {"stage": name, "bytes_in": 0, "bytes_out": 0, "cache_hits": 0, "cache_misses": 0}
+            token = _STAGE.set(rec)
+            child0 = _child_cpu(); t0, c0 = time.perf_counter(), time.thread_time()
+            try:
+                return fn(*args, **kw)
+            except BaseException as e:
+                rec["error"] = repr(e); raise
+            finally:
+                rec.update(wall_s=round(time.perf_counter() - t0, 3),
+                           cpu_s=round(time.thread_time() - c0, 3))
+                if resource:
+                    rec["child_cpu_s"] = round(_child_cpu() - child0, 3)
+                    rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                              resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+                    rec["peak_rss_mb"] = round(rss / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+                _STAGE.reset(token); report.add(rec)
+        return wrapper
+    return deco
+
+def trace_count(key: str, n: int = 1) -> None:
+    """Add `n` to counter `key` (bytes_in, cache_hits…) of the running stage."""
+    rec = _STAGE.get()
+    if rec is not None:
+        rec[key] = rec.get(key, 0) + n
+
+def _child_cpu() -> float:
+    if not resource:
+        return 0.0
+    ru = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return ru.ru_utime + ru.ru_stime
+
+# ─────────────────────────── HTTP LAYER ───────────────────────
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+class HttpPool:
+    """One keep-alive `requests.Session` per host (Pexels API, Pexels CDN,
+    ElevenLabs…). Connection errors and 429/5xx answers are retried with
+    exponential backoff plus jitter, honouring `Retry-After`; `stats` counts
+    requests, retries, error answers and failures per host."""
+
+    def __init__(self, pool_size: int):
+        self.pool_size = pool_size
+        self.stats: dict[str, Counter] = defaultdict(Counter)
+        self._sessions: dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def session(self, host: str) -> requests.Session:
+        import requests
+        from requests.adapters import HTTPAdapter
+        with self._lock:
+            if host not in self._sessions:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                s.mount("https://", adapter); s.mount("http://", adapter)
+                self._sessions[host] = s
+            return self._sessions[host]
+
+    def request(self, method: str, url: str, **kw) -> requests.Response:
+        import requests
+        host = urlsplit(url).netloc; session = self.session(host)
+        for attempt in range(HTTP_RETRIES + 1):
+            self.count(host, "requests")
+            try:
+                r = session.request(method, url, **kw)
+                trace_count("bytes_out", len(r.request.body or b""))
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == HTTP_RETRIES:
+                    self.count(host, "failures"); raise
+                delay = self._backoff(attempt)
+            else:
+                if r.status_code not in RETRY_STATUS or attempt == HTTP_RETRIES:
+                    if r.status_code >= 400:
+                        self.count(host, "errors")
+                    if not kw.get("stream"):  # streamed bodies are counted by their readers
+                        trace_count("bytes_in", len(r.content))
+                    return r
+                delay = _retry_after(r.headers.get("Retry-After")) or self._backoff(attempt)
+                r.close()
+            self.count(host, "retries"); time.sleep(delay)
+
+    def get(self, url: str, **kw) -> requests.Response:
+        return self.request("GET", url, **kw)
+
+    def post(self, url: str, **kw) -> requests.Response:
+        return self.request("POST", url, **kw)
+
+    def count(self, host: str, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[host][key] += n
+
+    def summary(self) -> str:
+        with self._lock:
+            return "; ".join(f"{h} " + " ".join(f"{k}={v}" for k, v in c.items())
+                             for h, c in self.stats.items())
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        base = HTTP_BACKOFF * 2 ** attempt
+        return base + random.uniform(0, base)
+
+def _retry_after(value: str | None) -> float | None:
+    """Seconds from a `Retry-After` header (delta-seconds or HTTP-date), capped at 60."""
+    if not value:
+        return None
+    try:
+        delay = float(value)
+    except ValueError:
+        try:
+            delay = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(delay, 0.0), 60.0)
+
+HTTP = HttpPool(pool_size=ASSET_WORKERS * 2)
+
+# ─────────────────────────── DISK CACHE ───────────────────────
+
+@contextlib.contextmanager
+def _sqlite(path: Path):
+    """Short-lived connection to `path` (autocommit; BEGIN IMMEDIATE where
+    a read-modify-write must be atomic across processes)."""
+    db = sqlite3.connect(path, timeout=30, isolation_level=None)
+    db.row_factory = sqlite3.Row
+    try:
+        yield db
+    finally:
+        db.close()
+
+class DiskCache:
+    """Files in `root` plus an `index.json` (key → file, size, last use, meta).
+    Entries are written to a temp file and renamed into place, and the
+    least-recently-used ones are evicted once the total exceeds `max_bytes`."""
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root, self.max_bytes = root, max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._index_path = root / "index.json"
+        self._lock = threading.Lock()
+        try:
+            index = json.loads(self._index_path.read_text())
+        except (OSError, ValueError):
+            index = {}
+        self._index = {k: e for k, e in index.items() if (root / e["file"]).exists()}
+
+    def get(self, key: str) -> Path | None:
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            path = self.root / entry["file"]
+            if not path.exists():
+                del self._index[key]; self._save(); return None
+            entry["used"] = time.time(); self._save()
+            return path
+
+    def meta(self, key: str) -> dict:
+        with self._lock:
+            return dict(self._index.get(key, {}).get("meta", {}))
+
+    def has_prefix(self, prefix: str) -> bool:
+        with self._lock:
+            return any(k.startswith(prefix) for k in self._index)
+
+    def key_of(self, path: Path) -> str | None:
+        with self._lock:
+            return next((k for k, e in self._index.items() if e["file"] == path.name), None)
+
+    def put(self, key: str, fill: Callable[[Path], dict | None], suffix: str = "",
+            meta: dict | None = None) -> Path:
+        """Store the file `fill(tmp_path)` writes under `key` and return its path.
+        A dict returned by `fill` is merged into the entry's `meta`."""
+        name = hashlib.sha256(key.encode()).hexdigest()[:32] + suffix
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".part"); os.close(fd)
+        try:
+            info = fill(Path(tmp))
+            meta = {**(meta or {}), **(info if isinstance(info, dict) else {})}
+            os.replace(tmp, self.root / name)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True); raise
+        with self._lock:
+            self._index[key] = {"file": name, "size": (self.root / name).stat().st_size,
+                                "used": time.time(), "meta": meta}
+            self._evict(keep=key); self._save()
+        return self.root / name
+
+    def _evict(self, keep: str) -> None:
+        total = sum(e["size"] for e in self._index.values())
+        for key, entry in sorted(self._index.items(), key=lambda kv: kv[1]["used"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            (self.root / entry["file"]).unlink(missing_ok=True)
+            total -= entry["size"]; del self._index[key]
+
+    def _save(self) -> None:
+        tmp = self._index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._index)); os.replace(tmp, self._index_path)
+
+CLIP_CACHE   = DiskCache(CACHE_DIR / "clips", CLIP_CACHE_MB << 20)
+SEARCH_CACHE = DiskCache(CACHE_DIR / "search", 16 << 20)
+TTS_CACHE    = DiskCache(CACHE_DIR / "tts", TTS_CACHE_MB << 20)
+CAPTION_CACHE = DiskCache(CACHE_DIR / "captions", 64 << 20)
+
+# ───────────── OAuth helper (run once with --auth) ─────────────
+
+def get_refresh_token() -> None:
+    if not Path("client_secret.json").exists():
+        sys.exit("ERROR: client_secret.json missing")
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    flow = InstalledAppFlow.from_client_secrets_file(
+        "client_secret.json", scopes=["https://www.googleapis.com/auth/youtube.upload"])
+    creds = flow.run_local_server(port=0, prompt="consent")
+    print("\nREFRESH_TOKEN:\n" + creds.refresh_token + "\n")
+    print("Paste this into GitHub secret YT_REFRESH_TOKEN")
+
+# ────────────────────────── OPENAI SCRIPT ─────────────────────
+
+@functools.cache
+def openai_client():
+    from openai import OpenAI
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+SCRIPT_MODEL     = "gpt-3.5-turbo-0125"
+SCRIPT_MAX_WORDS = 60
+SCRIPT_BATCH     = 10  # topics per batched request
+SCRIPT_POOL      = os.getenv("SCRIPT_POOL", "1") == "1"  # serve pre-generated scripts first
+SCRIPT_STREAM    = os.getenv("SCRIPT_STREAM", "1") == "1"  # stream tokens, search clips per finished sentence
+CLIPS_PER_SHORT  = 3  # one per fact
+
+@traced("script")
+def generate_script(topic: str, lang: str, on_sentence: Callable[[str], None] | None = None) -> str:
+    """Script for `topic`. With `on_sentence` the completion is streamed and
+    each sentence is handed over as soon as it is complete, so callers can
+    start work on it while the rest is still being generated."""
+    prompt = (
+        f"Scrivi un copione divertente in 3 fatti su {topic} in massimo 60 parole. Termina con una domanda."
+        if lang == "it" else
+        f"Write a fun, 3‑fact script about {topic} in ≤60 words. End with a question."
+    )
+    if on_sentence is None:
+        resp = openai_client().chat.completions.create(
+            model=SCRIPT_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.8,
+            max_tokens=90,
+        )
+        _count_tokens(resp)
+        return resp.choices[0].message.content.strip()
+    stream = openai_client().chat.completions.create(
+        model=SCRIPT_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.8,
+        max_tokens=90,
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    text, done = "", 0  # `done`: chars of `text` already handed over
+    for chunk in stream:
+        _count_tokens(chunk)
+        if chunk.choices and chunk.choices[0].delta.content:
+            text += chunk.choices[0].delta.content
+            # a sentence is complete once something follows its end mark;
+            # match offsets are relative to the slice, i.e. to `base`
+            base = done
+            for m in re.finditer(r"[^.!?]*[.!?]+\s", text[base:]):
+                on_sentence(m.group().strip()); done = base + m.end()
+    if text[done:].strip():
+        on_sentence(text[done:].strip())
+    return text.strip()
+
+@traced("script")
+def generate_scripts(topics: list[str], lang: str, rounds: int = 3) -> list[str]:
+    """One script per topic from as few chat completions as possible: up to
+    SCRIPT_BATCH topics per JSON-mode request, then only the scripts failing
+    `script_problem` are asked for again (`rounds` times at most). Scripts
+    still invalid after that are kept; topics that never got one fall back to
+    `generate_script`."""
+    scripts: list[str | None] = [None] * len(topics)
+    pending = list(range(len(topics)))
+    for _ in range(rounds):
+        for start in range(0, len(pending), SCRIPT_BATCH):
+            group = pending[start:start + SCRIPT_BATCH]
+            for i, script in zip(group, _script_batch([topics[i] for i in group], lang)):
+                scripts[i] = script or scripts[i]
+        pending = [i for i in pending if not scripts[i] or script_problem(scripts[i])]
+        if not pending:
+            break
+        trace_count("script_retries", len(pending))
+    for i in pending:
+        print(f"Script for {topics[i]!r}: {script_problem(scripts[i]) if scripts[i] else 'missing'} "
+              f"after {rounds} rounds")
+        scripts[i] = scripts[i] or generate_script(topics[i], lang)
+    return scripts
+
+def script_problem(script: str) -> str | None:
+    """What breaks the script rules (≤ SCRIPT_MAX_WORDS words, ends with a
+    question), or None."""
+    words = len(script.split())
+    if words > SCRIPT_MAX_WORDS:
+        return f"{words} words"
+    if not script.rstrip().rstrip("\"'”’»)").endswith("?"):
+        return "no closing question"
+    return None
+
+def _script_batch(topics: list[str], lang: str) -> list[str | None]:
+    """One JSON-mode completion for `topics`; scripts in `topics` order, None
+    where the reply has no usable entry. Entries are matched by position, or
+    by topic when the count is off; a repeated topic is only matched by
+    position, since one topic-keyed entry would serve every copy of it."""
+    rules = (
+        f"Per ciascun argomento scrivi un copione divertente in 3 fatti, in italiano, in massimo "
+        f"{SCRIPT_MAX_WORDS} parole, che termini con una domanda."
+        if lang == "it" else
+        f"For each topic write a fun, 3‑fact script in ≤{SCRIPT_MAX_WORDS} words that ends with a question."
+    )
+    if len(set(topics)) < len(topics):
+        rules += (" Gli argomenti possono ripetersi: ogni copione deve essere diverso." if lang == "it" else
+                  " Topics may repeat: make every script different.")
+    prompt = (f'{rules}\nReply with JSON: {{"scripts": [{{"topic": "...", "script": "..."}}]}}, '
+              f"one entry per topic, in order.\nTopics: {json.dumps(topics, ensure_ascii=False)}")
+    resp = openai_client().chat.completions.create(
+        model=SCRIPT_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.8,
+        max_tokens=120 * len(topics) + 40,
+        response_format={"type": "json_object"},
+    )
+    _count_tokens(resp)
+    try:
+        entries = [e for e in json.loads(resp.choices[0].message.content)["scripts"] if isinstance(e, dict)]
+    except (TypeError, ValueError, KeyError):
+        return [None] * len(topics)
+    repeats = {t for t, n in Counter(topics).items() if n > 1}
+    by_topic = {e.get("topic"): e.get("script") for e in entries if e.get("topic") not in repeats}
+    in_order = [e.get("script") for e in entries] if len(entries) == len(topics) else [None] * len(topics)
+    return [(s.strip() if isinstance(s, str) and s.strip() else None)
+            for s in (o or by_topic.get(t) for t, o in zip(topics, in_order))]
+
+def _count_tokens(resp) -> None:
+    if getattr(resp, "usage", None):
+        trace_count("tokens_in", resp.usage.prompt_tokens); trace_count("tokens_out", resp.usage.completion_tokens)
+
+class ScriptPool:
+    """`CACHE_DIR/scripts.db`: scripts generated ahead of time (`--prefill-scripts`)
+    so a run starts on media work at once. Scripts are deduplicated by their
+    normalized text and each one is served once; served rows are kept so a
+    regenerated duplicate is still rejected."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = path or CACHE_DIR / "scripts.db"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with _sqlite(self.path) as db:
+            db.execute("""CREATE TABLE IF NOT EXISTS scripts (
+                id INTEGER PRIMARY KEY, topic TEXT, lang TEXT, script TEXT,
+                digest TEXT UNIQUE, created REAL, served REAL)""")
+
+    def add(self, topic: str, lang: str, scripts: list[str]) -> int:
+        """Store the new, valid `scripts`; returns how many were added."""
+        rows = [(topic, lang, s, hashlib.sha256(" ".join(s.lower().split()).encode()).hexdigest(), time.time())
+                for s in scripts if s and not script_problem(s)]
+        with _sqlite(self.path) as db:
+            before = db.total_changes
+            db.executemany("INSERT OR IGNORE INTO scripts (topic, lang, script, digest, created) "
+                           "VALUES (?, ?, ?, ?, ?)", rows)
+            return db.total_changes - before
+
+    def pop(self, lang: str, topic: str | None = None) -> tuple[str, str] | None:
+        """An unserved `(topic, script)` in `lang` (for `topic`, or any topic at
+        random), marked as served; None when the pool has none."""
+        with _sqlite(self.path) as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute("SELECT id, topic, script FROM scripts WHERE served IS NULL AND lang = ? "
+                             "AND (? IS NULL OR topic = ?) ORDER BY RANDOM() LIMIT 1",
+                             (lang, topic, topic)).fetchone()
+            if row:
+                db.execute("UPDATE scripts SET served = ? WHERE id = ?", (time.time(), row["id"]))
+            db.execute("COMMIT")
+        return (row["topic"], row["script"]) if row else None
+
+    def available(self, lang: str) -> dict[str, int]:
+        """Unserved scripts per topic in `lang`."""
+        with _sqlite(self.path) as db:
+            return dict(db.execute("SELECT topic, COUNT(*) FROM scripts WHERE served IS NULL AND lang = ? "
+                                   "GROUP BY topic", (lang,)).fetchall())
+
+def prefill_scripts(n: int, lang: str, topics: list[str] | None = None, rounds: int = 3) -> dict[str, int]:
+    """Top the pool up to `n` unserved scripts per topic (default TOPICS) in
+    `lang` with batched requests; duplicates are dropped and asked for again.
+    Returns the unserved count per topic."""
+    pool = ScriptPool(); topics = topics or TOPICS
+    for _ in range(rounds):
+        have = pool.available(lang)
+        wanted = [t for t in topics for _ in range(max(0, n - have.get(t, 0)))]
+        if not wanted:
+            break
+        scripts = generate_scripts(wanted, lang)
+        for topic in topics:
+            pool.add(topic, lang, [s for t, s in zip(wanted, scripts) if t == topic])
+    return {t: pool.available(lang).get(t, 0) for t in topics}
+
+# ─────────────────────── PEXELS STOCK VIDEO ───────────────────
+
+_refreshing: set[str] = set()
+_refresh_lock = threading.Lock()
+
+def pexels_search(query: str, orientation: str = "vertical", per_page: int = 10,
+                  page: int = 1) -> list[dict]:
+    """`/videos/search` results, served from SEARCH_CACHE while younger than
+    SEARCH_TTL. With SEARCH_SWR an expired entry is still returned at once and
+    refreshed on a background thread."""
+    params = {"query": query, "orientation": orientation, "per_page": per_page, "page": page}
+    key = json.dumps(params, sort_keys=True)
+    cached = SEARCH_CACHE.get(key)
+    if cached:
+        fresh = time.time() - SEARCH_CACHE.meta(key).get("fetched", 0) <= SEARCH_TTL
+        if fresh or SEARCH_SWR:
+            try:
+                vids = json.loads(cached.read_text())
+            except (OSError, ValueError):
+                return _search_remote(key, params)
+            trace_count("cache_hits")
+            if not fresh:
+                with _refresh_lock:
+                    stale = key not in _refreshing; _refreshing.add(key)
+                if stale:
+                    threading.Thread(target=_search_remote, args=(key, params, True), daemon=True).start()
+            return vids
+    return _search_remote(key, params)
+
+def _search_remote(key: str, params: dict, background: bool = False) -> list[dict]:
+    if not background:
+        trace_count("cache_misses")
+    try:
+        r = HTTP.get(f"{PEXELS_API}/videos/search", params=params,
+                     headers=HEADERS_PEXELS, timeout=20)
+        r.raise_for_status(); vids = r.json().get("videos", [])
+        SEARCH_CACHE.put(key, lambda p: p.write_text(json.dumps(vids)), ".json",
+                         {"fetched": time.time()})
+        return vids
+    except Exception as e:
+        if not background:
+            raise
+        print(f"Pexels search refresh failed for {params['query']!r}: {e}")
+        return []
+    finally:
+        with _refresh_lock:
+            _refreshing.discard(key)
+
+@traced("clip")
+def fetch_vertical_clip(query: str, need_s: float | None = None, fallbacks: list[str] = ()) -> Path:
+    """Random vertical clip for `query`, or for the first of `fallbacks` with
+    results when it has none; with `need_s` only (roughly) its first
+    `need_s` seconds are downloaded when the file and the CDN allow it."""
+    for q in (query, *fallbacks):
+        if vids := pexels_search(q):
+            if q != query:
+                print(f"No vertical clips for {query!r}, using {q!r}")
+            break
+    else:
+        raise RuntimeError(f"No vertical clips for {query!r}")
+    video = cached_video(vids) or random.choice(vids)
+    file = pick_rendition(video["video_files"])
+    key = f"{video['id']}-{file.get('id') or file['link']}"
+    cached = CLIP_CACHE.get(key)
+    if cached:
+        covers = CLIP_CACHE.meta(key).get("covers")
+        if covers is None or (need_s and covers >= need_s):
+            trace_count("cache_hits"); return cached
+    trace_count("cache_misses")
+    return CLIP_CACHE.put(key, lambda dst: download_clip(file["link"], dst, need_s, video.get("duration")), ".mp4",
+                          {"link": file["link"], "duration": video.get("duration")})
+
+def pick_rendition(files: list[dict], w: int = FRAME_W, h: int = FRAME_H, fps: float = FPS) -> dict:
+    """Smallest Pexels rendition that covers w×h at ≥ fps, so the render never
+    upscales or scales down more than needed. Without one, fps is relaxed first,
+    then the largest rendition below target is taken."""
+    mp4 = [f for f in files if f.get("file_type", "video/mp4") == "video/mp4"] or files
+    def px(f): return (f.get("width") or 0) * (f.get("height") or 0)
+    def covers(f): return (f.get("width") or 0) >= w and (f.get("height") or 0) >= h
+    def smooth(f): return (f.get("fps") or fps) >= fps - 0.5  # 29.97 counts as 30
+    for reason, ok in (("meets target", [f for f in mp4 if covers(f) and smooth(f)]),
+                       ("meets size, low fps", [f for f in mp4 if covers(f)])):
+        if ok:
+            sized = all(f.get("size") for f in ok)
+            choice = min(ok, key=lambda f: (f["size"] if sized else px(f), (f.get("width"), f.get("height")) != (w, h)))
+            break
+    else:
+        reason, choice = "below target", max(mp4, key=lambda f: (px(f), f.get("fps") or 0))
+    size = f"{choice['size'] / 1e6:.1f} MB" if choice.get("size") else "size n/a"
+    print(f"Rendition: {choice.get('width')}x{choice.get('height')}@{choice.get('fps') or '?'} "
+          f"{size} ({reason}, {len(mp4)} candidates)")
+    return choice
+
+# ───────────── Byte-range downloads (faststart MP4 only) ──────
+
+PROBE_BYTES  = 64 << 10
+RANGE_MARGIN = 1.3        # × the CBR byte estimate for the needed seconds
+RANGE_SLACK  = 256 << 10  # extra bytes on top, for the first GOP / VBR peaks
+
+def download_clip(link: str, dst: Path, need_s: float | None, duration: float | None) -> dict:
+    """Download `link` to `dst` and return `{"covers": s, "bytes": n}`.
+
+    `covers` is None for a complete file. When only the first `need_s` of a
+    `duration`-second clip is needed, the file's leading bytes are probed with a
+    Range request; if the moov atom precedes mdat (faststart) just the byte
+    range covering `need_s` (estimated from the file's average bitrate) is
+    fetched. Servers that ignore Range, partial answers without a total size,
+    and non-faststart files get a full download."""
+    partial = bool(need_s and duration and need_s < duration)
+    headers = {"Range": f"bytes=0-{PROBE_BYTES - 1}"} if partial else {}
+    with HTTP.get(link, headers=headers, stream=True, timeout=60) as src, open(dst, "wb") as out:
+        src.raise_for_status()
+        if src.status_code != 206:  # full body (no Range asked for, or the server ignored it)
+            return {"covers": None, "bytes": _copy(src, out)}
+        total = _range_total(src.headers.get("Content-Range", ""))
+        if total is not None:
+            head = b"".join(src.iter_content(1 << 16)); out.write(head); trace_count("bytes_in", len(head))
+    if total is None:  # a range of unknown size ("bytes 0-65535/*") → start over with a plain GET
+        with HTTP.get(link, stream=True, timeout=60) as src, open(dst, "wb") as out:
+            src.raise_for_status()
+            return {"covers": None, "bytes": _copy(src, out)}
+    want = _range_want(total, need_s, duration) if _mp4_faststart(head) else total
+    return _fetch_rest(link, dst, len(head), want, total, need_s)
+
+def _range_want(total: int, need_s: float, duration: float) -> int:
+    """Leading bytes of a `total`-byte, `duration`-second faststart MP4 that
+    cover its first `need_s` seconds (CBR estimate plus margins)."""
+    return min(total, int(total * need_s / duration * RANGE_MARGIN) + RANGE_SLACK)
+
+def _fetch_rest(link: str, dst: Path, got: int, want: int, total: int, need_s: float) -> dict:
+    """Append bytes `got`…`want` of `link` to `dst` (holding the first `got`)."""
+    if got < want:
+        with HTTP.get(link, headers={"Range": f"bytes={got}-{want - 1}"}, stream=True, timeout=60) as src:
+            src.raise_for_status()
+            if src.status_code != 206:  # range refused after all → start over with the full body
+                with open(dst, "wb") as out:
+                    return {"covers": None, "bytes": _copy(src, out)}
+            with open(dst, "ab") as out:
+                got += _copy(src, out)
+    print(f"Clip: {got / 1e6:.1f}/{total / 1e6:.1f} MB" + (" (range)" if want < total else ""))
+    return {"covers": need_s if want < total else None, "bytes": got, "total": total}
+
+@traced("topup")
+def extend_clip(clip: Path, need_s: float) -> Path:
+    """`clip` once it covers `need_s` seconds. The download was sized from the
+    script's estimated length; when the voice-over runs longer, the missing
+    byte range of a partial clip is fetched and appended to a copy of it."""
+    key = CLIP_CACHE.key_of(clip)
+    meta = CLIP_CACHE.meta(key) if key else {}
+    if meta.get("covers") is None or meta["covers"] >= need_s or not meta.get("link"):
+        return clip
+    trace_count("clip_topups")
+    def fill(dst: Path):
+        shutil.copyfile(clip, dst)
+        want = _range_want(meta["total"], need_s, meta["duration"])
+        return _fetch_rest(meta["link"], dst, meta["bytes"], want, meta["total"], need_s)
+    return CLIP_CACHE.put(key, fill, ".mp4", meta)
+
+def _copy(src, out) -> int:
+    n = 0
+    for chunk in src.iter_content(1 << 16):
+        out.write(chunk); n += len(chunk)
+    trace_count("bytes_in", n)
+    return n
+
+def _range_total(content_range: str) -> int | None:
+    """Total size from `Content-Range: bytes 0-65535/1234567`."""
+    total = content_range.rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+def _mp4_faststart(head: bytes) -> bool:
+    """True when the top-level `moov` box appears before `mdat` in `head`."""
+    pos = 0
+    while pos + 8 <= len(head):
+        size, kind = struct.unpack(">I4s", head[pos:pos + 8])
+        if kind == b"moov":
+            return True
+        if kind == b"mdat" or size == 0:
+            return False
+        if size == 1:
+            if pos + 16 > len(head):
+                return False
+            size = struct.unpack(">Q", head[pos + 8:pos + 16])[0]
+        if size < 8:
+            return False
+        pos += size
+    return False
+
+def cached_video(vids: list[dict]) -> dict | None:
+    """A search result with a clip already in CLIP_CACHE, so repeat topics need
+    no download; None when there is none, or for the CLIP_VARIETY share of
+    picks that go random to keep the footage fresh."""
+    if random.random() < CLIP_VARIETY:
+        return None
+    hits = [v for v in vids if CLIP_CACHE.has_prefix(f"{v['id']}-")]
+    return random.choice(hits) if hits else None
+
+# ───────────────────────── ELEVENLABS TTS ─────────────────────
+
+def tts_key(text: str, lang: str) -> str:
+    voice = VOICE_ID.get(lang, VOICE_ID["en"])
+    return hashlib.sha256(json.dumps([text, voice, TTS_MODEL]).encode()).hexdigest()
+
+@traced("voice")
+def generate_voiceover(text: str, lang: str) -> Path:
+    """MP3 voice-over for `text`; identical (text, voice, model) requests are
+    served from TTS_CACHE, whose meta also records the measured `duration` and
+    the per-word timings (`words`) from ElevenLabs' character alignment."""
+    key = tts_key(text, lang)
+    cached = TTS_CACHE.get(key)
+    if cached:
+        trace_count("cache_hits"); return cached
+    trace_count("cache_misses")
+    url = f"{ELEVEN_API}/v1/text-to-speech/{VOICE_ID.get(lang, VOICE_ID['en'])}/stream/with-timestamps"
+    def fill(dst: Path) -> dict:
+        t0 = time.monotonic(); ttfb = None; total = wire = 0
+        chars: list[str] = []; starts: list[float] = []; ends: list[float] = []
+        with HTTP.post(
+                url,
+                headers={"xi-api-key": ELEVEN_KEY, "Content-Type": "application/json"},
+                json={"text": text, "model_id": TTS_MODEL},
+                stream=True, timeout=60) as r, open(dst, "wb") as out:
+            r.raise_for_status()
+            for line in r.iter_lines():  # one JSON object per audio chunk
+                if not line:
+                    continue
+                if ttfb is None:
+                    ttfb = time.monotonic() - t0
+                wire += len(line); chunk = json.loads(line)
+                audio = base64.b64decode(chunk.get("audio_base64") or "")
+                out.write(audio); total += len(audio)
+                if align := chunk.get("alignment"):
+                    # chunk times may restart at 0; shift them after what we already have
+                    first = align["character_start_times_seconds"][:1]
+                    shift = ends[-1] if ends and first and first[0] < ends[-1] - 0.05 else 0.0
+                    chars += align["characters"]
+                    starts += [t + shift for t in align["character_start_times_seconds"]]
+                    ends += [t + shift for t in align["character_end_times_seconds"]]
+        trace_count("bytes_in", wire)
+        print(f"TTS: {total/1024:.0f} KiB, first byte {ttfb or 0:.2f}s, "
+              f"total {time.monotonic() - t0:.2f}s")
+        return {"duration": audio_duration(dst), "bytes": total, "ttfb": ttfb,
+                "words": alignment_words(chars, starts, ends)}
+    return TTS_CACHE.put(key, fill, ".mp3")
+
+def alignment_words(chars: list[str], starts: list[float], ends: list[float]) -> list[list]:
+    """`[word, start, end]` triples from a character-level alignment."""
+    words: list[list] = []; current = None
+    for ch, start, end in zip(chars, starts, ends):
+        if ch.isspace():
+            current = None
+        elif current is None:
+            current = [ch, start, end]; words.append(current)
+        else:
+            current[0] += ch; current[2] = end
+    return words
+
+def energy_align(audio: Path, text: str) -> list[list]:
+    """Fallback word timings: spread the words of `text` over the voiced
+    (above-threshold RMS) 20 ms windows of `audio`, in proportion to length."""
+    import numpy as np
+    pcm = subprocess.run([FFMPEG, "-v", "error", "-i", str(audio), "-ac", "1", "-ar", "8000",
+                          "-f", "s16le", "-"], capture_output=True, check=True).stdout
+    x = np.frombuffer(pcm, np.int16).astype(np.float32)
+    n = len(x) // 160  # 20 ms windows at 8 kHz
+    words = text.split()
+    if not n or not words:
+        return []
+    rms = np.sqrt((x[:n * 160].reshape(n, 160) ** 2).mean(axis=1))
+    voiced = np.flatnonzero(rms > 0.1 * np.percentile(rms, 95)) * 0.02
+    if not len(voiced):
+        voiced = np.arange(n) * 0.02
+    weights = np.array([len(w) + 1 for w in words], dtype=float)
+    edges = np.concatenate([[0.0], np.cumsum(weights)]) / weights.sum()
+    idx = np.minimum((edges * len(voiced)).astype(int), len(voiced) - 1)
+    return [[w, float(voiced[a]), float(voiced[b] + 0.02)] for w, a, b in zip(words, idx[:-1], idx[1:])]
+
+def voice_words(voice: Path, text: str, lang: str) -> list[list]:
+    """Word timings for a voice-over: ElevenLabs alignment when cached, else
+    the energy-based estimate."""
+    return TTS_CACHE.meta(tts_key(text, lang)).get("words") or energy_align(voice, text)
+
+MP3_BITRATES = {1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],   # kbit/s, layer III
+                2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160]}
+
+def audio_duration(path: Path) -> float:
+    """Length of `path` in seconds, read from the MP3 headers (Xing/Info/VBRI
+    frame count, else the CBR bitrate) without decoding; other formats fall
+    back to MoviePy."""
+    if (seconds := _mp3_duration(path)) is not None:
+        return seconds
+    from moviepy.editor import AudioFileClip
+    clip = AudioFileClip(str(path))
+    try:
+        return clip.duration
+    finally:
+        clip.close()
+
+def _mp3_duration(path: Path) -> float | None:
+    size = path.stat().st_size
+    with open(path, "rb") as f:
+        head = f.read(10); start = 0
+        if head[:3] == b"ID3" and len(head) == 10:  # skip the ID3v2 tag (syncsafe size)
+            start = 10 + sum((b & 0x7F) << (7 * (3 - i)) for i, b in enumerate(head[6:10]))
+        f.seek(start); frame = f.read(4 + 32 + 32 + 18)
+    if len(frame) < 4:
+        return None
+    hdr = struct.unpack(">I", frame[:4])[0]
+    version, layer = (hdr >> 19) & 3, (hdr >> 17) & 3
+    if hdr >> 21 != 0x7FF or version == 1 or layer != 1:  # no frame sync, or not layer III
+        return None
+    mpeg1 = version == 3
+    rate = [44100, 48000, 32000][(hdr >> 10) & 3] if (hdr >> 10) & 3 < 3 else None
+    kbps = MP3_BITRATES[1 if mpeg1 else 2][(hdr >> 12) & 0xF] if (hdr >> 12) & 0xF < 15 else 0
+    if not rate or not kbps:
+        return None
+    rate >>= {3: 0, 2: 1, 0: 2}[version]
+    samples = 1152 if mpeg1 else 576
+    mono = (hdr >> 6) & 3 == 3
+    side = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+    if frame[4 + side:8 + side] in (b"Xing", b"Info"):
+        flags = struct.unpack(">I", frame[8 + side:12 + side])[0]
+        if flags & 1:
+            return struct.unpack(">I", frame[12 + side:16 + side])[0] * samples / rate
+    if frame[36:40] == b"VBRI":
+        return struct.unpack(">I", frame[50:54])[0] * samples / rate
+    return (size - start) * 8 / (kbps * 1000)
+
+def estimate_duration(script: str) -> float:
+    """Voice-over length guess for `script`, before the TTS audio exists."""
+    return min(len(script.split()) / SPEECH_WPS + TAIL_PAD, MAX_DURATION)
+
+def plan_segments(audio: Path, n_clips: int) -> tuple[float, float]:
+    """`(total, per_clip)` seconds: the timeline follows the voice-over (plus
+    TAIL_PAD), capped at the Shorts limit, split evenly across the clips."""
+    total = min(audio_duration(audio) + TAIL_PAD, MAX_DURATION)
+    return total, total / n_clips
+
+# ───────────────────── CONCURRENT ASSET STAGE ─────────────────
+
+STOPWORDS = set("""
+    about after also because been before being could does doesn every from have here into just know
+    more most much never only other over some than that their them then there these they this those
+    very what when where which while will with would your you're did don't isn't can't fact facts
+    alla anche come con dalla degli della delle dello dove essere hanno loro molto nella nelle negli
+    ogni perché però più quale quando quella quelle quello questa queste questo sono tutti tutte fatto
+    first second third fourth fifth next last lastly finally firstly secondly thirdly imagine another
+    actually really even still however meanwhile plus believe think guess ever
+    primo prima secondo seconda terzo terza quarto quarta ultimo ultima infine inoltre sapevi sai
+    immagina pensa ecco invece quindi infatti ancora anzi mentre sempre dopo davvero allora
+""".split())
+
+def sentence_keyword(sentence: str) -> str | None:
+    """Stock-footage query for one sentence of a script: its first word of
+    four or more letters that is not a stopword (usually the fact's subject)."""
+    for word in re.findall(r"[^\W\d_]{4,}", sentence):
+        if word.lower() not in STOPWORDS:
+            return word.lower()
+    return None
+
+def topic_words(topic: str) -> list[str]:
+    """The topic's words as stock-footage queries (also the fallback for a
+    sentence keyword Pexels has nothing for)."""
+    return [w for w in dict.fromkeys(topic.lower().split()) if w not in STOPWORDS]
+
+def script_keywords(script: str, topic: str) -> list[str]:
+    """CLIPS_PER_SHORT queries for `script`: one per sentence, topped up with
+    the topic's words."""
+    keywords: list[str] = []
+    for sentence in re.findall(r"[^.!?]+[.!?]*", script):
+        if (kw := sentence_keyword(sentence)) and kw not in keywords:
+            keywords.append(kw)
+    keywords += [w for w in topic_words(topic) if w not in keywords]
+    return keywords[:CLIPS_PER_SHORT]
+
+def stream_script(topic: str, lang: str) -> tuple[str, dict]:
+    """Generate the script streamed and start each clip download as soon as
+    a sentence yields a keyword, overlapping the completion with Pexels. The
+    download is sized for the longest allowed script. Returns the script and
+    `{keyword: Future[Path]}` for `fetch_assets`."""
+    early: dict = {}
+    need = (SCRIPT_MAX_WORDS / SPEECH_WPS + TAIL_PAD) / CLIPS_PER_SHORT
+    pool = ThreadPoolExecutor(max_workers=CLIPS_PER_SHORT, thread_name_prefix="prefetch")
+    def on_sentence(sentence: str):
+        kw = sentence_keyword(sentence)
+        if kw and kw not in early and len(early) < CLIPS_PER_SHORT:
+            early[kw] = pool.submit(contextvars.copy_context().run, fetch_vertical_clip, kw, need,
+                                    topic_words(topic))
+    try:
+        script = generate_script(topic, lang, on_sentence)
+    except BaseException:
+        pool.shutdown(wait=False, cancel_futures=True); raise
+    pool.shutdown(wait=False)  # running downloads finish; fetch_assets waits on them
+    return script, early
+
+def fetch_assets(keywords: list[str], script: str, lang: str,
+                 early: dict | None = None, fallbacks: list[str] = ()) -> tuple[list[Path], Path]:
+    """Fetch every clip and the voice-over at once; clips keep `keywords` order,
+    and a keyword without results takes the first of `fallbacks` that has some.
+    Clips already started by `stream_script` (`early`) are awaited, not refetched.
+    Downloads are sized from the script; once the voice-over is back, partial
+    clips shorter than their segment of it are topped up (`extend_clip`)."""
+    early = early or {}
+    pool = ThreadPoolExecutor(max_workers=ASSET_WORKERS, thread_name_prefix="asset")
+    try:
+        need = estimate_duration(script) / len(keywords)
+        tasks = [(f"clip {k!r}", early[k].result, ()) if k in early else
+                 (f"clip {k!r}", fetch_vertical_clip, (k, need, fallbacks)) for k in keywords]
+        tasks.append(("voice-over", generate_voiceover, (script, lang)))
+        *clips, voice = _gather(pool, tasks, ASSET_TIMEOUT)
+        seg = plan_segments(voice, len(clips))[1]
+        clips = _gather(pool, [(f"top-up {k!r}", extend_clip, (c, seg)) for k, c in zip(keywords, clips)],
+                        ASSET_TIMEOUT)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return clips, voice
+
+def _gather(pool: ThreadPoolExecutor, tasks: list, timeout: float) -> list:
+    """Run `(name, fn, args)` tasks; raise on the first error or on a task that
+    has been running longer than `timeout` seconds, without waiting for the rest."""
+    started: dict[int, float] = {}
+    def timed(i, fn, args):
+        started[i] = time.monotonic(); return fn(*args)
+    futs = {pool.submit(contextvars.copy_context().run, timed, i, fn, args): i  # keeps the RunReport
+            for i, (_, fn, args) in enumerate(tasks)}
+    pending = set(futs)
+    while pending:
+        now = time.monotonic()
+        deadlines = [started[futs[f]] + timeout for f in pending if futs[f] in started]
+        done, pending = wait(pending, timeout=max(0.05, min(deadlines, default=now + 1) - now),
+                             return_when=FIRST_EXCEPTION)
+        for f in done:
+            if f.exception():
+                raise RuntimeError(f"{tasks[futs[f]][0]} failed: {f.exception()}") from f.exception()
+        now = time.monotonic()
+        for f in pending:
+            if futs[f] in started and now - started[futs[f]] > timeout:
+                raise TimeoutError(f"{tasks[futs[f]][0]} exceeded {timeout:.0f}s")
+    return [f.result() for f in futs]
+
+# ───────────────────────── VIDEO ASSEMBLY ─────────────────────
+
+# x264 settings per use case; `benchmark.py profiles` measures encode time vs.
+# size. CRF with a VBV cap keeps Shorts small, so encode + upload is fastest
+# with "fast-upload"; "draft" is the old ultrafast/uncapped setting.
+ENCODER_PROFILES = {
+    "draft":       {"preset": "ultrafast", "crf": 23, "maxrate": None, "gop": 250, "audio_bitrate": "128k"},
+    "fast-upload": {"preset": "veryfast",  "crf": 26, "maxrate": "4M", "gop": 2 * FPS, "audio_bitrate": "128k"},
+    "balanced":    {"preset": "medium",    "crf": 23, "maxrate": "8M", "gop": 2 * FPS, "audio_bitrate": "160k"},
+    "archive":     {"preset": "slow",      "crf": 18, "maxrate": None, "gop": 4 * FPS, "audio_bitrate": "192k"},
+}
+
+def encoder_profile(name: str | None = None) -> dict:
+    """Profile `name` (default ENCODER_PROFILE) with `threads` = all cores."""
+    return {**ENCODER_PROFILES[name or ENCODER_PROFILE], "threads": os.cpu_count() or 4}
+
+def x264_params(enc: dict) -> list[str]:
+    """Rate-control/GOP flags shared by both engines (preset/threads are passed separately)."""
+    args = ["-crf", str(enc["crf"]), "-g", str(enc["gop"]), "-pix_fmt", "yuv420p"]
+    if enc["maxrate"]:
+        size = int(enc["maxrate"].rstrip("M")) * 2
+        args += ["-maxrate", enc["maxrate"], "-bufsize", f"{size}M"]
+    return args
+
+# Intermediates are near-lossless and keyframed every second so assembly can
+# cut them anywhere cheaply; they are encoded once per (clip, length).
+NORMALIZED = {"preset": "veryfast", "crf": 18, "gop": FPS}
+FIT_FILTER = (f"scale={FRAME_W}:{FRAME_H}:force_original_aspect_ratio=increase,"
+              f"crop={FRAME_W}:{FRAME_H},fps={FPS},setsar=1")
+
+@traced("render")
+def build_video(clips: list[Path], audio: Path, script: str, out_path: Path,
+                engine: str | None = None, profile: str | None = None, words: list[list] | None = None):
+    """Render with `engine` (default RENDER_ENGINE) and encoder `profile`;
+    MoviePy is the fallback. With `words` timings the captions follow the
+    voice-over, otherwise the whole script is shown at once.
+
+    Clips are first normalized (NORMALIZE_CLIPS) so the engine only concats
+    and captions. "auto" does this for MoviePy, whose per-frame compositing it
+    replaces; the ffmpeg engines already normalize in the same pass, so there
+    intermediates only pay off when clips are reused."""
+    engine = engine or RENDER_ENGINE
+    native = {"ffmpeg": build_video_ffmpeg, "segments": build_video_segments}
+    normalized = NORMALIZE_CLIPS == "1" or (NORMALIZE_CLIPS == "auto" and engine not in native)
+    if normalized:
+        try:
+            clips = normalize_clips(clips, plan_segments(audio, len(clips))[1])
+        except (OSError, subprocess.SubprocessError, RuntimeError) as e:
+            print(f"clip normalization failed ({e}) → rendering the raw clips"); normalized = False
+    if engine in native:
+        try:
+            return native[engine](clips, audio, script, out_path, profile, words, normalized)
+        except (OSError, subprocess.SubprocessError, RuntimeError) as e:
+            print(f"{engine} engine failed ({e}) → falling back to MoviePy")
+    build_video_moviepy(clips, audio, script, out_path, profile, words, normalized)
+
+@traced("normalize")
+def normalize_clips(clips: list[Path], seconds: float) -> list[Path]:
+    """`normalize_clip` every clip in parallel; keeps `clips` order. Each
+    encode gets RENDER_TIMEOUT; ffmpeg is killed when it runs over."""
+    pool = ThreadPoolExecutor(max_workers=ASSET_WORKERS, thread_name_prefix="normalize")
+    try:
+        return _gather(pool, [(f"normalize {p.name}", normalize_clip, (p, seconds)) for p in clips],
+                       RENDER_TIMEOUT)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def normalize_clip(src: Path, seconds: float) -> Path:
+    """`src` scaled/cropped to FRAME_W×FRAME_H at FPS, looped or trimmed to
+    `seconds` (rounded up to whole seconds, so similar lengths share an entry),
+    as a silent H.264 intermediate cached in CLIP_CACHE next to its source."""
+    seconds = math.ceil(seconds); st = src.stat()
+    key = json.dumps(["normalized", str(src), st.st_size, st.st_mtime_ns, seconds,
+                      FRAME_W, FRAME_H, FPS, NORMALIZED])
+    cached = CLIP_CACHE.get(key)
+    if cached:
+        trace_count("cache_hits"); return cached
+    trace_count("cache_misses")
+    def fill(dst: Path):
+        subprocess.run([FFMPEG, "-y", "-v", "error", "-stream_loop", "-1", "-t", str(seconds), "-i", str(src),
+                        "-vf", FIT_FILTER,
+                        "-an", "-c:v", "libx264", "-preset", NORMALIZED["preset"],
+                        "-crf", str(NORMALIZED["crf"]), "-g", str(NORMALIZED["gop"]), "-pix_fmt", "yuv420p",
+                        "-movflags", "+faststart", "-f", "mp4", str(dst)], check=True, timeout=RENDER_TIMEOUT)
+    return CLIP_CACHE.put(key, fill, ".mp4", {"normalized": True})
+
+# ───────────── Captions (Pillow, rendered once per text) ───────
+
+PHRASE_WORDS     = 4   # timed captions show at most this many words at once
+PHRASE_SIZE      = 80  # px, font size of timed captions
+HIGHLIGHT        = "#FFD400"
+
+def render_caption(text: str, width: int, size: int = 60, color: str = "white",
+                   stroke: str = "black", stroke_width: int = 2, highlight: int | None = None,
+                   height: int | None = None) -> Path:
+    """`text` word-wrapped to `width` px and rasterized into a transparent PNG,
+    cached by (text, font, size, colours, width). Word number `highlight` is
+    drawn in HIGHLIGHT; `height` fixes the canvas height (text centred)."""
+    key = json.dumps(["caption", text, FONT_PATH or FONT, size, color, stroke, stroke_width, width,
+                      highlight, height])
+    cached = CAPTION_CACHE.get(key)
+    if cached:
+        trace_count("cache_hits"); return cached
+    trace_count("cache_misses")
+    def fill(dst: Path):
+        from PIL import Image, ImageDraw
+        font, lines, line_h = caption_layout(text, width, size, stroke_width)
+        img_h = height or caption_height(len(lines), size, stroke_width)
+        img = Image.new("RGBA", (width, img_h), (0, 0, 0, 0)); draw = ImageDraw.Draw(img)
+        y = (img_h - caption_height(len(lines), size, stroke_width)) // 2 + stroke_width
+        space, i = font.getlength(" "), 0
+        for line in lines:
+            x = (width - font.getlength(line)) / 2
+            for word in line.split():
+                draw.text((x, y), word, font=font, fill=HIGHLIGHT if i == highlight else color,
+                          stroke_width=stroke_width, stroke_fill=stroke)
+                x += font.getlength(word) + space; i += 1
+            y += line_h
+        img.save(dst, format="PNG")
+    return CAPTION_CACHE.put(key, fill, ".png")
+
+def caption_layout(text: str, width: int, size: int, stroke_width: int = 2):
+    """(font, wrapped lines, line pitch) for a caption."""
+    font = caption_font(size)
+    return font, _wrap_px(text, font, width - 2 * stroke_width), size + size // 5
+
+def caption_height(n_lines: int, size: int, stroke_width: int = 2) -> int:
+    return max(1, n_lines * (size + size // 5) - size // 5 + size // 4 + 2 * stroke_width)
+
+def caption_track(script: str, words: list[list] | None, width: int) -> list[tuple[float, Path]]:
+    """`(start, png)` caption frames, each shown until the next one starts.
+
+    Without `words` this is the whole script as one static caption. With
+    `[word, start, end]` timings the words are grouped into phrases (up to
+    PHRASE_WORDS, or up to punctuation) and each frame shows the current phrase
+    with the spoken word highlighted. Every distinct frame is one cached PNG."""
+    if not words:
+        return [(0.0, render_caption(script, width))]
+    phrases, current = [], []
+    for w in words:
+        current.append(w)
+        if len(current) == PHRASE_WORDS or w[0][-1] in ".,!?;:":
+            phrases.append(current); current = []
+    if current:
+        phrases.append(current)
+    height = max(caption_height(len(caption_layout(" ".join(w[0] for w in p), width, PHRASE_SIZE)[1]),
+                                PHRASE_SIZE) for p in phrases)
+    track = [(0.0, render_caption("", width, PHRASE_SIZE, height=height))]
+    for phrase in phrases:
+        text = " ".join(w[0] for w in phrase)
+        for i, (_, start, _) in enumerate(phrase):
+            track.append((max(start, track[-1][0]), render_caption(text, width, PHRASE_SIZE,
+                                                                  highlight=i, height=height)))
+    return track
+
+@functools.cache
+def caption_font(size: int):
+    from PIL import ImageFont
+    path = FONT_PATH or _fc_match(FONT)
+    if path:
+        return ImageFont.truetype(path, size)
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:  # Pillow < 10.1: bitmap font, fixed size
+        return ImageFont.load_default()
+
+def _fc_match(name: str) -> str | None:
+    """Font file for an ImageMagick-style name such as "Montserrat-Bold"."""
+    family, _, style = name.partition("-")
+    try:
+        out = subprocess.run(["fc-match", "-f", "%{file}", f"{family}:style={style or 'Regular'}"],
+                             capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out or None
+
+def _wrap_px(text: str, font, width: int) -> list[str]:
+    lines: list[str] = []
+    for word in text.split():
+        if lines and font.getlength(f"{lines[-1]} {word}") <= width:
+            lines[-1] += f" {word}"
+        else:
+            lines.append(word)
+    return lines
+
+def track_blender(track: list[tuple[float, Path]], frame_w: int, frame_h: int):
+    """`fl` function applying the caption frame active at time t; each PNG's
+    blender is built once and reused for every video frame it covers."""
+    starts = [t for t, _ in track]
+    blenders = {png: caption_blender(png, frame_w, frame_h) for png in {p for _, p in track}}
+    def apply(get_frame, t):
+        return blenders[track[max(bisect.bisect_right(starts, t) - 1, 0)][1]](get_frame(t))
+    return apply
+
+def caption_blender(png: Path, frame_w: int, frame_h: int):
+    """`fl_image` function alpha-blending the caption at bottom centre. The
+    alpha mask and premultiplied colours are computed once; each frame only
+    touches the caption's own rows."""
+    import numpy as np
+    from PIL import Image
+    rgba = np.asarray(Image.open(png).convert("RGBA"), dtype=np.float32)[-frame_h:, :frame_w]
+    h, w = rgba.shape[:2]
+    alpha = rgba[..., 3:] / 255.0
+    premult, inv = rgba[..., :3] * alpha, 1.0 - alpha
+    y0, x0 = frame_h - h, (frame_w - w) // 2
+    def blend(frame):
+        out = frame.copy()
+        region = out[y0:y0 + h, x0:x0 + w]
+        region[:] = (region * inv + premult).astype(np.uint8)
+        return out
+    return blend
+
+def build_video_moviepy(clips: list[Path], audio: Path, script: str, out_path: Path,
+                        profile: str | None = None, words: list[list] | None = None,
+                        normalized: bool = False):
+    """MoviePy engine; `normalized` clips share size and fps, so they are
+    chained as-is instead of composited frame by frame."""
+    from moviepy.editor import VideoFileClip, AudioFileClip, concatenate_videoclips, vfx
+    total, seg = plan_segments(audio, len(clips))
+    parts = [VideoFileClip(str(p), audio=not normalized) for p in clips]
+    base = concatenate_videoclips([
+        v.subclip(0, seg) if v.duration >= seg else v.fx(vfx.loop, duration=seg) for v in parts
+    ], method="chain" if normalized else "compose")
+    voice = AudioFileClip(str(audio))
+    base = base.set_audio(voice.subclip(0, min(voice.duration, total)))
+    track = caption_track(script, words, int(base.w * 0.9))
+    if len(track) == 1:
+        final = base.fl_image(caption_blender(track[0][1], base.w, base.h))
+    else:
+        final = base.fl(track_blender(track, base.w, base.h))
+    enc = encoder_profile(profile)
+    final.write_videofile(str(out_path), codec="libx264", audio_codec="aac", fps=FPS,
+                          preset=enc["preset"], threads=enc["threads"],
+                          audio_bitrate=enc["audio_bitrate"], ffmpeg_params=x264_params(enc),
+                          logger=None)
+
+def build_video_ffmpeg(clips: list[Path], audio: Path, script: str, out_path: Path,
+                       profile: str | None = None, words: list[list] | None = None,
+                       normalized: bool = False):
+    """Single ffmpeg process: scale/crop each clip to FRAME_W×FRAME_H, concat,
+    overlay the pre-rendered caption PNG(s) and mux the voice-over. Timed
+    captions are fed as an ffconcat image sequence with per-frame durations;
+    `normalized` clips are joined by the concat demuxer without any filters."""
+    (total, seg), n = plan_segments(audio, len(clips)), len(clips)
+    track = caption_track(script, words, int(FRAME_W * 0.9))
+    cmd = [FFMPEG, "-y", "-v", "error"]
+    if normalized:
+        cmd += ["-f", "concat", "-safe", "0", "-i", str(_ffconcat(
+            out_path.with_suffix(".clips.ffconcat"), [(p, None, seg) for p in clips]))]
+        graph, n = "[0:v]setpts=PTS-STARTPTS[base];", 1
+    else:
+        for p in clips:  # input-side -t stops decoding each clip after its segment; short clips loop
+            cmd += ["-stream_loop", "-1", "-t", f"{seg:.3f}", "-i", str(p)]
+        graph = "".join(f"[{i}:v]setpts=PTS-STARTPTS,{FIT_FILTER}[v{i}];" for i in range(n))
+        graph += "".join(f"[v{i}]" for i in range(n)) + f"concat=n={n}:v=1:a=0[base];"
+    cmd += _caption_input(track, out_path.with_suffix(".ffconcat"), total) + ["-i", str(audio)]
+    graph += f"[base][{n}:v]overlay=(W-w)/2:H-h:shortest=1,format=yuv420p[out]"
+    enc = encoder_profile(profile)
+    cmd += ["-filter_complex", graph, "-map", "[out]", "-map", f"{n + 1}:a",
+            "-c:v", "libx264", "-preset", enc["preset"], "-threads", str(enc["threads"]),
+            *x264_params(enc), "-r", str(FPS), "-c:a", "aac", "-b:a", enc["audio_bitrate"],
+            "-movflags", "+faststart", "-t", f"{total:.3f}", str(out_path)]
+    try:
+        subprocess.run(cmd, check=True)
+    finally:
+        out_path.with_suffix(".ffconcat").unlink(missing_ok=True)
+        out_path.with_suffix(".clips.ffconcat").unlink(missing_ok=True)
+
+def _caption_input(track: list[tuple[float, Path]], listing: Path, end: float) -> list[str]:
+    """ffmpeg input args for a caption track: one looped PNG, or an ffconcat
+    image sequence (written to `listing`) lasting at least until `end`."""
+    if len(track) == 1:
+        return ["-loop", "1", "-i", str(track[0][1])]
+    ends = [t for t, _ in track[1:]] + [max(end, track[-1][0]) + 1]
+    entries = [(png, stop - start, None) for (start, png), stop in zip(track, ends)]
+    entries.append((track[-1][1], None, None))  # the last duration only applies if the file repeats
+    return ["-f", "concat", "-safe", "0", "-i", str(_ffconcat(listing, entries))]
+
+def build_video_segments(clips: list[Path], audio: Path, script: str, out_path: Path,
+                         profile: str | None = None, words: list[list] | None = None,
+                         normalized: bool = False):
+    """Encode each clip's segment, with its slice of the captions, as its own
+    ffmpeg job (all in parallel, cores shared between them), then join the
+    segments with the concat demuxer (stream copy) and mux the voice-over.
+    Segment boundaries fall on whole frames so the joined timeline does not
+    drift from the captions. Every ffmpeg run is killed after RENDER_TIMEOUT."""
+    total, _ = plan_segments(audio, len(clips)); n = len(clips)
+    track = caption_track(script, words, int(FRAME_W * 0.9))
+    frames = round(total * FPS); cuts = [round(i * frames / n) for i in range(n + 1)]
+    enc = encoder_profile(profile); enc["threads"] = -(-enc["threads"] // n)
+    parts = [out_path.with_name(f"{out_path.stem}.seg{i}.mp4") for i in range(n)]
+    tasks = [(f"segment {i}", _encode_segment,
+              (clips[i], cuts[i + 1] - cuts[i], slice_track(track, cuts[i] / FPS, cuts[i + 1] / FPS),
+               parts[i], enc, normalized)) for i in range(n)]
+    pool = ThreadPoolExecutor(max_workers=n, thread_name_prefix="segment")  # each job is an ffmpeg process
+    try:
+        _gather(pool, tasks, RENDER_TIMEOUT)
+        listing = _ffconcat(out_path.with_suffix(".ffconcat"), [(p, None, None) for p in parts])
+        subprocess.run([FFMPEG, "-y", "-v", "error", "-f", "concat", "-safe", "0", "-i", str(listing),
+                        "-i", str(audio), "-map", "0:v", "-map", "1:a", "-c:v", "copy",
+                        "-c:a", "aac", "-b:a", enc["audio_bitrate"], "-movflags", "+faststart",
+                        "-t", f"{total:.3f}", str(out_path)], check=True, timeout=RENDER_TIMEOUT)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        out_path.with_suffix(".ffconcat").unlink(missing_ok=True)
+        for p in parts:
+            p.unlink(missing_ok=True); p.with_suffix(".ffconcat").unlink(missing_ok=True)
+
+def slice_track(track: list[tuple[float, Path]], start: float, end: float) -> list[tuple[float, Path]]:
+    """The part of a caption track shown in [start, end), re-timed to start at 0."""
+    i = max(bisect.bisect_right([t for t, _ in track], start) - 1, 0)
+    return [(0.0, track[i][1])] + [(t - start, png) for t, png in track[i + 1:] if t < end]
+
+def _encode_segment(clip: Path, frames: int, track: list[tuple[float, Path]], dst: Path,
+                    enc: dict, normalized: bool):
+    seconds = frames / FPS
+    fit = "setpts=PTS-STARTPTS" if normalized else f"setpts=PTS-STARTPTS,{FIT_FILTER}"
+    subprocess.run([FFMPEG, "-y", "-v", "error", "-stream_loop", "-1", "-t", f"{seconds + 0.5:.3f}",
+                    "-i", str(clip), *_caption_input(track, dst.with_suffix(".ffconcat"), seconds),
+                    "-filter_complex", f"[0:v]{fit}[v];[v][1:v]overlay=(W-w)/2:H-h,format=yuv420p[out]",
+                    "-map", "[out]", "-an", "-c:v", "libx264", "-preset", enc["preset"],
+                    "-threads", str(enc["threads"]), *x264_params(enc), "-r", str(FPS),
+                    "-frames:v", str(frames), str(dst)], check=True, timeout=RENDER_TIMEOUT)
+
+def _ffconcat(path: Path, entries: list[tuple[Path, float | None, float | None]]) -> Path:
+    """Write a concat-demuxer list of `(file, duration, outpoint)` entries."""
+    quote = lambda p: "'" + str(p).replace("'", "'\\''") + "'"
+    lines = ["ffconcat version 1.0"]
+    for file, duration, outpoint in entries:
+        lines.append(f"file {quote(file)}")
+        if duration is not None:
+            lines.append(f"duration {duration:.3f}")
+        if outpoint is not None:
+            lines.append(f"outpoint {outpoint:.3f}")
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+# ────────────────────────── YOUTUBE UPLOAD ────────────────────
+
+def yt_credentials():
+    """User credentials from YT_REFRESH_TOKEN plus the OAuth app's id/secret, read
+    from client_secret.json and overridable with YT_CLIENT_ID / YT_CLIENT_SECRET
+    / YT_TOKEN_URI."""
+    from google.oauth2.credentials import Credentials
+    info = {"refresh_token": os.getenv("YT_REFRESH_TOKEN")}
+    if Path("client_secret.json").exists():
+        app = next(iter(json.loads(Path("client_secret.json").read_text()).values()))  # "installed" | "web"
+        info.update({k: app[k] for k in ("client_id", "client_secret", "token_uri") if k in app})
+    for key in ("client_id", "client_secret", "token_uri"):
+        if os.getenv(f"YT_{key.upper()}"):
+            info[key] = os.getenv(f"YT_{key.upper()}")
+    creds = Credentials.from_authorized_user_info(info)  # always sets Google's token_uri
+    return creds.with_token_uri(info["token_uri"]) if "token_uri" in info else creds
+
+@traced("upload")
+def upload_short(video: Path, title: str, description: str) -> str | None:
+    """Upload `video` as a public Short; returns the YouTube video id."""
+    try:
+        creds = yt_credentials()
+    except ImportError:
+        print("google-auth missing → skip upload"); return
+    body = {"snippet": {"title": title, "description": description, "categoryId": "27"},
+            "status": {"privacyStatus": "public"}}
+    print("Uploading…", end="", flush=True)
+    return resumable_upload(video, body, creds)
+
+def resumable_upload(video: Path, metadata: dict, creds,
+                     on_chunk: Callable[[int, int], None] | None = None) -> str:
+    """YouTube's resumable upload protocol, UPLOAD_CHUNK_MB per PUT.
+
+    Connection errors and 429/5xx back off exponentially (UPLOAD_RETRIES in a
+    row at most), then ask the server how much it already has and continue
+    from there. The session URI is kept in `<video>.upload.json` until the
+    upload completes, so a crashed process resumes mid-file instead of
+    starting over. `on_chunk(done, size)` runs after every accepted chunk
+    (default: print progress). Returns the video id."""
+    import requests
+    from google.auth.transport.requests import Request
+    size = video.stat().st_size
+    step = max(1, int(UPLOAD_CHUNK_MB * (1 << 20)) >> 18) << 18  # the API wants 256 KiB multiples
+    def auth(refresh: bool = False) -> dict:
+        if refresh or not creds.valid:
+            creds.refresh(Request(HTTP.session(urlsplit(creds.token_uri).netloc)))
+        return {"Authorization": f"Bearer {creds.token}"}
+    uri = _upload_session(video, metadata, size, auth)
+    host = urlsplit(uri).netloc; session = HTTP.session(host)
+    t0 = time.monotonic(); sent = failures = 0; offset = None  # None → ask the server
+    on_chunk = on_chunk or (lambda done, total: print(f" {done / total * 100:.0f}%", end="", flush=True))
+    with open(video, "rb") as f:
+        while True:
+            if offset is None:
+                data, rng = b"", f"bytes */{size}"
+            else:
+                f.seek(offset); data = f.read(step)
+                rng = f"bytes {offset}-{offset + len(data) - 1}/{size}"
+            HTTP.count(host, "requests")
+            try:
+                r = session.put(uri, data=data, headers={**auth(), "Content-Range": rng}, timeout=120)
+            except (requests.ConnectionError, requests.Timeout):
+                r = None
+            else:
+                if data:
+                    sent += len(data); trace_count("bytes_out", len(data))
+            if r is not None and r.status_code in (200, 201):
+                video.with_suffix(".upload.json").unlink(missing_ok=True)
+                elapsed = time.monotonic() - t0
+                video_id = r.json().get("id")
+                print(f" done → {video_id} ({size / 1e6:.1f} MB in {elapsed:.1f}s, "
+                      f"{sent / 1e6 / max(elapsed, 1e-6):.1f} MB/s)")
+                return video_id
+            if r is not None and r.status_code == 308:  # incomplete: Range says what the server has
+                have = r.headers.get("Range", "").rpartition("-")[2]
+                offset = int(have) + 1 if have.isdigit() else 0
+                if data:
+                    failures = 0; on_chunk(offset, size)
+                continue
+            if r is not None and r.status_code == 401:
+                auth(refresh=True)
+            elif r is not None and r.status_code in (404, 410):  # session expired: start a new one
+                video.with_suffix(".upload.json").unlink(missing_ok=True)
+                uri = _upload_session(video, metadata, size, auth); offset = 0
+                continue
+            elif r is not None and r.status_code not in RETRY_STATUS:
+                HTTP.count(host, "failures"); r.raise_for_status()
+            if failures == UPLOAD_RETRIES:
+                HTTP.count(host, "failures")
+                raise RuntimeError(f"upload failed after {failures} retries "
+                                   f"({r.status_code if r is not None else 'connection error'})")
+            HTTP.count(host, "retries")
+            delay = (_retry_after(r.headers.get("Retry-After")) if r is not None else None)
+            time.sleep(delay or HttpPool._backoff(failures))
+            failures += 1; offset = None
+
+def _upload_session(video: Path, metadata: dict, size: int, auth: Callable[..., dict]) -> str:
+    """Session URI for `video`: the saved one if it is for this exact file and
+    younger than the API's one-week limit, else a newly started session."""
+    state = video.with_suffix(".upload.json"); stat = video.stat()
+    if state.exists():
+        saved = json.loads(state.read_text())
+        if (saved.get("size"), saved.get("mtime_ns")) == (size, stat.st_mtime_ns) \
+                and time.time() - saved.get("created", 0) < 6 * 86400:
+            print(" resuming", end="", flush=True); return saved["uri"]
+    r = HTTP.post(YT_UPLOAD_URL, params={"uploadType": "resumable", "part": "snippet,status"},
+                  headers={**auth(), "X-Upload-Content-Length": str(size),
+                           "X-Upload-Content-Type": "video/mp4"},
+                  json=metadata, timeout=30)
+    r.raise_for_status()
+    state.write_text(json.dumps({"uri": r.headers["Location"], "size": size,
+                                 "mtime_ns": stat.st_mtime_ns, "created": time.time()}))
+    return r.headers["Location"]
+
+# ───────────────────────── RUN MANIFEST ───────────────────────
+
+class RunManifest:
+    """`WORKDIR/runs/<run_id>.json`: what each finished stage (script, assets,
+    render, upload) produced, so `--resume <run_id>` can skip it."""
+
+    def __init__(self, run_id: str | None = None):
+        self.run_id = run_id or datetime.utcnow().strftime("%Y%m%d_%H%M%S_%f")
+        self.path = WORKDIR / "runs" / f"{self.run_id}.json"
+        if run_id and not self.path.exists():
+            raise FileNotFoundError(f"No run manifest for {run_id!r} in {self.path.parent}")
+        self.data = json.loads(self.path.read_text()) if run_id else {"run_id": self.run_id, "stages": {}}
+
+    def get(self, stage: str) -> dict | None:
+        """Artifacts of `stage`, or None if it never finished or its files are gone."""
+        rec = self.data["stages"].get(stage)
+        if rec and all(Path(p).exists() for p in rec.get("files", [])):
+            return rec
+        return None
+
+    def done(self, stage: str, files: list[Path] = (), **artifacts) -> None:
+        self.data["stages"][stage] = {**artifacts, "files": [str(p) for p in files],
+                                      "at": datetime.utcnow().isoformat() + "Z"}
+        self.path.parent.mkdir(exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.data, indent=2)); os.replace(tmp, self.path)
+
+# ───────────────────────── UPLOAD QUEUE ───────────────────────
+
+class UploadQueue:
+    """`WORKDIR/uploads.db`: rendered Shorts waiting for `--upload-worker`.
+
+    Items move queued → uploading → done, or back to queued on failure until
+    UPLOAD_ATTEMPTS is used up (then "failed"). A claim is a lease: if the
+    worker dies, the item is taken again once UPLOAD_LEASE has passed, and
+    the upload resumes from its saved session."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = path or WORKDIR / "uploads.db"
+        with self._db() as db:
+            db.execute("""CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY, video TEXT UNIQUE, title TEXT, description TEXT,
+                run_id TEXT, state TEXT DEFAULT 'queued', attempts INTEGER DEFAULT 0,
+                lease_until REAL, video_id TEXT, error TEXT, created REAL, updated REAL)""")
+
+    def _db(self):
+        return _sqlite(self.path)
+
+    def add(self, video: Path, title: str, description: str, run_id: str | None = None) -> int:
+        """Queue `video` (once: re-adding the same file returns its id)."""
+        now = time.time()
+        with self._db() as db:
+            db.execute("INSERT OR IGNORE INTO items (video, title, description, run_id, created, updated) "
+                       "VALUES (?, ?, ?, ?, ?, ?)", (str(video), title, description, run_id, now, now))
+            return db.execute("SELECT id FROM items WHERE video = ?", (str(video),)).fetchone()[0]
+
+    def claim(self) -> dict | None:
+        """Lease the oldest queued (or abandoned) item, or None."""
+        now = time.time()
+        with self._db() as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute("SELECT * FROM items WHERE state = 'queued' OR "
+                             "(state = 'uploading' AND lease_until < ?) ORDER BY id LIMIT 1", (now,)).fetchone()
+            if row:
+                db.execute("UPDATE items SET state = 'uploading', attempts = attempts + 1, lease_until = ?, "
+                           "updated = ? WHERE id = ?", (now + UPLOAD_LEASE, now, row["id"]))
+            db.execute("COMMIT")
+        return dict(row) if row else None
+
+    def done(self, item_id: int, video_id: str) -> None:
+        self._set(item_id, state="done", video_id=video_id, error=None)
+
+    def fail(self, item_id: int, error: str) -> str:
+        """Record a failed attempt; returns the item's new state."""
+        with self._db() as db:
+            attempts = db.execute("SELECT attempts FROM items WHERE id = ?", (item_id,)).fetchone()[0]
+        state = "failed" if attempts >= UPLOAD_ATTEMPTS else "queued"
+        self._set(item_id, state=state, error=error); return state
+
+    def _set(self, item_id: int, **cols) -> None:
+        cols["updated"] = time.time()
+        with self._db() as db:
+            db.execute(f"UPDATE items SET {', '.join(f'{k} = ?' for k in cols)} WHERE id = ?",
+                       (*cols.values(), item_id))
+
+    def counts(self) -> dict[str, int]:
+        with self._db() as db:
+            return dict(db.execute("SELECT state, COUNT(*) FROM items GROUP BY state").fetchall())
+
+def upload_worker(workers: int | None = None) -> int:
+    """Drain the upload queue with `workers` (default UPLOAD_WORKERS) uploads
+    at a time, waiting UPLOAD_IDLE s for new items once it is empty. Marks
+    each item's run manifest as uploaded; returns how many items ran out of
+    attempts."""
+    queue, failed, lock = UploadQueue(), 0, threading.Lock()
+    def work():
+        nonlocal failed
+        idle_since = None
+        while True:
+            item = queue.claim()
+            if item is None:
+                idle_since = idle_since or time.monotonic()
+                if time.monotonic() - idle_since >= UPLOAD_IDLE:
+                    return
+                time.sleep(min(5.0, UPLOAD_IDLE)); continue
+            idle_since = None
+            print(f"Upload #{item['id']} (attempt {item['attempts'] + 1}): {item['video']}")
+            try:
+                video_id = upload_short(Path(item["video"]), item["title"], item["description"])
+                if not video_id:
+                    raise RuntimeError("upload skipped")
+            except Exception as e:
+                state = queue.fail(item["id"], repr(e))
+                print(f"Upload #{item['id']} failed ({e}) → {state}")
+                if state == "failed":
+                    with lock:
+                        failed += 1
+                continue
+            queue.done(item["id"], video_id)
+            if item["run_id"] and (WORKDIR / "runs" / f"{item['run_id']}.json").exists():
+                RunManifest(item["run_id"]).done("upload", video_id=video_id)
+    with ThreadPoolExecutor(max_workers=workers or UPLOAD_WORKERS, thread_name_prefix="upload") as pool:
+        for f in [pool.submit(work) for _ in range(workers or UPLOAD_WORKERS)]:
+            f.result()
+    print("Upload queue:", ", ".join(f"{k}={v}" for k, v in sorted(queue.counts().items())) or "empty")
+    return failed
+
+# ────────────────────────── MAIN ROUTINE ──────────────────────
+
+TOPICS = [
+    "quantum computing", "Mars colonization", "deep-sea creatures",
+    "ancient Egyptian tech", "AI art", "sustainable architecture",
+]
+
+def pick_topic() -> str:
+    return random.choice(TOPICS)
+
+@dataclass
+class Short:
+    topic: str
+    lang: str
+    script: str
+    clips: list[Path]
+    voice: Path
+    out: Path
+    manifest: RunManifest
+    report: RunReport = field(default_factory=RunReport)
+
+def prepare_short(lang: str, topic: str | None = None, run_id: str | None = None,
+                  script: str | None = None) -> Short:
+    """Network half of a run: script, stock clips and voice-over. With `run_id`
+    the stages already recorded in that run's manifest are reused; a given
+    `script` (for `topic`) skips generating one."""
+    manifest = RunManifest(run_id)
+    print(f"Run {manifest.run_id} (resume with --resume {manifest.run_id})")
+    report = RunReport(); token = _REPORT.set(report); early: dict = {}
+    try:
+        if done := manifest.get("script"):
+            topic, lang, script = done["topic"], done["lang"], done["script"]
+        else:
+            if not script and SCRIPT_POOL and (pooled := ScriptPool().pop(lang, topic)):
+                topic, script = pooled; print("Script from the pool")
+            topic = topic or pick_topic()
+            if not script and SCRIPT_STREAM:
+                script, early = stream_script(topic, lang)
+            script = script or generate_script(topic, lang)
+            manifest.done("script", topic=topic, lang=lang, script=script)
+        print("SCRIPT:\n" + script)
+        if done := manifest.get("assets"):
+            clips, voice = [Path(p) for p in done["clips"]], Path(done["voice"])
+        else:
+            keywords = [*early][:CLIPS_PER_SHORT]
+            keywords += [k for k in script_keywords(script, topic) if k not in keywords]
+            clips, voice = fetch_assets(keywords[:CLIPS_PER_SHORT], script, lang, early, topic_words(topic))
+            manifest.done("assets", files=[*clips, voice], clips=[str(p) for p in clips], voice=str(voice))
+    finally:
+        _REPORT.reset(token)
+    out    = WORKDIR / f"short_{manifest.run_id}.mp4"
+    return Short(topic, lang, script, clips, voice, out, manifest, report)
+
+def finish_short(short: Short, upload: bool):
+    """Render (and optionally upload) a prepared Short, skipping stages its
+    manifest already records; the stage timings go to a JSON run report next
+    to the MP4."""
+    token = _REPORT.set(short.report); manifest = short.manifest
+    try:
+        if not manifest.get("render"):
+            words = voice_words(short.voice, short.script, short.lang) if CAPTION_MODE == "timed" else None
+            build_video(short.clips, short.voice, short.script, short.out, words=words)
+            manifest.done("render", files=[short.out])
+        print("Video saved →", short.out)
+        if done := manifest.get("upload"):
+            print("Already uploaded →", done["video_id"])
+        elif upload:
+            title = ("3 facts about " if short.lang == "en" else "3 fatti su ") + short.topic
+            if UPLOAD_QUEUE:
+                item = UploadQueue().add(short.out, title, short.script, manifest.run_id)
+                print(f"Queued for upload → #{item} (run --upload-worker)")
+            elif video_id := upload_short(short.out, title, short.script):
+                manifest.done("upload", video_id=video_id)
+    finally:
+        _REPORT.reset(token)
+        short.report.write(short.out.with_suffix(".json"))
+
+def run_once(lang: str, upload: bool, topic: str | None = None, resume: str | None = None) -> Short:
+    short = prepare_short(lang, topic, resume); finish_short(short, upload); return short
+
+def run_batch(topics: list[str | None], lang: str, upload: bool) -> int:
+    """Produce one Short per entry of `topics` (None → random topic) in this
+    process, fetching Short k+1's assets while Short k encodes. Scripts come
+    from the script pool, the rest from batched requests up front. Failed
+    Shorts are reported and skipped; returns how many failed."""
+    failed = 0
+    pooled = [ScriptPool().pop(lang, t) if SCRIPT_POOL else None for t in topics]
+    topics = [p[0] if p else t or pick_topic() for p, t in zip(pooled, topics)]
+    scripts = [p and p[1] for p in pooled]
+    if missing := [i for i, s in enumerate(scripts) if not s]:
+        try:
+            for i, s in zip(missing, generate_scripts([topics[i] for i in missing], lang)):
+                scripts[i] = s
+        except Exception as e:
+            print(f"Batched scripts failed ({e}) → one request per Short")
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch") as ahead:
+        nxt = ahead.submit(prepare_short, lang, topics[0], None, scripts[0])
+        for i in range(len(topics)):
+            print(f"── Short {i + 1}/{len(topics)} ──")
+            try:
+                short = nxt.result()
+            except Exception as e:
+                short = None; print(f"Short {i + 1}: preparation failed: {e}")
+            if i + 1 < len(topics):
+                nxt = ahead.submit(prepare_short, lang, topics[i + 1], None, scripts[i + 1])
+            if short is None:
+                failed += 1; continue
+            try:
+                finish_short(short, upload)
+            except Exception as e:
+                failed += 1; print(f"Short {i + 1}: render/upload failed: {e}")
+    print(f"Batch done: {len(topics) - failed}/{len(topics)} Shorts")
+    return failed
+
+def read_topics(path: str) -> list[str]:
+    lines = Path(path).read_text(encoding="utf-8").splitlines()
+    return [t.strip() for t in lines if t.strip() and not t.lstrip().startswith("#")]
+
+# ───────────────────────────── CLI ────────────────────────────
+def positive_int(value: str) -> int:
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {n}")
+    return n
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser("Faceless Shorts generator")
+    ap.add_argument("--auth",      action="store_true", help="Run OAuth only & exit")
+    ap.add_argument("--lang",      choices=["en","it"], default=DEFAULT_LANG, help="Script language")
+    ap.add_argument("--no-upload", action="store_true", help="Render but don't upload")
+    ap.add_argument("--enqueue",   action="store_true", default=UPLOAD_QUEUE,
+                    help="Queue renders for --upload-worker instead of uploading inline")
+    ap.add_argument("--engine",    choices=["moviepy","ffmpeg","segments"], default=RENDER_ENGINE,
+                    help="Render backend: MoviePy (the fallback), one ffmpeg filtergraph, "
+                         "or per-clip segments encoded in parallel")
+    ap.add_argument("--captions",  choices=["timed","static"], default=CAPTION_MODE,
+                    help="Word-timed captions or the whole script at once")
+    ap.add_argument("--profile",   choices=list(ENCODER_PROFILES), default=ENCODER_PROFILE,
+                    help="Encoder profile (speed vs. size)")
+    many = ap.add_mutually_exclusive_group()
+    many.add_argument("--count",   type=positive_int, metavar="N", help="Render N Shorts on random topics")
+    many.add_argument("--batch",   metavar="TOPICS_TXT", help="Render one Short per line of this file")
+    many.add_argument("--resume",  metavar="RUN_ID", help="Finish a failed run, skipping completed stages")
+    many.add_argument("--prefill-scripts", type=positive_int, metavar="N",
+                      help="Top the script pool up to N unused scripts per topic (for --lang)")
+    many.add_argument("--upload-worker", nargs="?", type=positive_int, const=UPLOAD_WORKERS, metavar="N",
+                      help="Only drain the upload queue, N uploads at a time")
+    args = ap.parse_args()
+    RENDER_ENGINE, ENCODER_PROFILE, CAPTION_MODE = args.engine, args.profile, args.captions
+    UPLOAD_QUEUE = args.enqueue
+
+    if args.auth:
+        get_refresh_token(); sys.exit()
+    if args.prefill_scripts is not None:
+        pool = prefill_scripts(args.prefill_scripts, args.lang)
+        print("Script pool:", ", ".join(f"{t}={k}" for t, k in pool.items())); sys.exit()
+    if args.upload_worker is not None:
+        failed = upload_worker(args.upload_worker)
+        print("HTTP:", HTTP.summary()); sys.exit(1 if failed else 0)
+
+    if args.count is not None or args.batch:
+        topics = read_topics(args.batch) if args.batch else [None] * args.count
+        if not topics:
+            sys.exit("ERROR: no topics to render")
+        failed = run_batch(topics, args.lang, upload=not args.no_upload)
+        print("HTTP:", HTTP.summary()); sys.exit(1 if failed else 0)
+    if args.resume and not (WORKDIR / "runs" / f"{args.resume}.json").exists():
+        sys.exit(f"ERROR: no run manifest for {args.resume!r} in {WORKDIR / 'runs'}")
+    run_once(args.lang, upload=not args.no_upload, resume=args.resume)
+    print("HTTP:", HTTP.summary())
+